@@ -1,15 +1,43 @@
 """Traffic analytics API routes."""
 
-from flask import Blueprint, request, jsonify
-from datetime import datetime, timedelta
+from decimal import Decimal
+from flask import Blueprint, Response, request, jsonify
+from werkzeug.http import http_date
+from datetime import date, datetime, timedelta
 from services.traffic_service import TrafficService
 from utils.auth_helpers import require_admin_auth
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 traffic_bp = Blueprint('traffic', __name__)
 traffic_service = TrafficService()
 
 
+def _orjson_default(value):
+    """Encode MySQL row values the same way Flask's default JSON provider does."""
+    if isinstance(value, date):
+        return http_date(value)
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError
+
+
+def _json_response(payload):
+    """Serialize analytics payloads with orjson when available, else jsonify."""
+    if orjson is None:
+        return jsonify(payload)
+    body = orjson.dumps(
+        payload,
+        default=_orjson_default,
+        option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_SORT_KEYS
+    )
+    return Response(body, mimetype='application/json')
+
+
 @traffic_bp.route('/api/admin/traffic/analytics', methods=['GET'])
 def get_traffic_analytics():
     """Get traffic analytics with filtering options."""
@@ -37,7 +65,7 @@ def get_traffic_analytics():
             user_filter=user_filter
         )
         
-        return jsonify({
+        return _json_response({
             'success': True,
             'data': analytics,
             'filters': {
@@ -64,7 +92,7 @@ def get_real_time_stats():
     
     try:
         stats = traffic_service.get_real_time_stats()
-        return jsonify({
+        return _json_response({
             'success': True,
             'data': stats
         })
@@ -85,7 +113,7 @@ def get_user_activity(user_id):
         days = int(request.args.get('days', 7))
         activity = traffic_service.get_user_activity_timeline(user_id=user_id, days=days)
         
-        return jsonify({
+        return _json_response({
             'success': True,
             'data': activity,
             'user_id': user_id,
@@ -110,7 +138,7 @@ def get_ip_analytics(ip_address):
         days = int(request.args.get('days', 30))
         analytics = traffic_service.get_ip_analytics(ip_address=ip_address, days=days)
         
-        return jsonify({
+        return _json_response({
             'success': True,
             'data': analytics,
             'ip_address': ip_address,
@@ -135,7 +163,7 @@ def get_top_endpoints():
         days = int(request.args.get('days', 7))
         endpoints = traffic_service.get_top_endpoints(days=days)
         
-        return jsonify({
+        return _json_response({
             'success': True,
             'data': endpoints,
             'days': days
@@ -159,7 +187,7 @@ def get_traffic_summary():
         # Get real-time stats which includes summary
         stats = traffic_service.get_real_time_stats()
         
-        return jsonify({
+        return _json_response({
             'success': True,
             'data': stats.get('overall_summary', {}),
             'timestamp': stats.get('timestamp')
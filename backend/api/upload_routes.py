@@ -1,5 +1,6 @@
 """API routes for guest OS upload management."""
 
+import os
 from flask import Blueprint, request, jsonify
 from services.upload_service import UploadService
 from database import UserDatabase
@@ -117,6 +118,20 @@ def delete_upload_server(server_id):
     return jsonify(result), 200 if result['success'] else 400
 
 
+@upload_bp.route('/api/admin/upload-servers/test', methods=['POST'])
+def test_all_upload_server_connections():
+    """Test connections to all active upload servers."""
+    token, ip_address = get_auth_info()
+    
+    has_perm, session, error = check_permission_for_session(db, token, 'view_upload_servers')
+    if not has_perm:
+        return jsonify({'success': False, 'error': error}), 403 if session else 401
+    
+    result = upload_service.test_all_connections()
+    
+    return jsonify(result), 200 if result['success'] else 500
+
+
 @upload_bp.route('/api/admin/upload-servers/<int:server_id>/test', methods=['POST'])
 def test_upload_server_connection(server_id):
     """Test connection to an upload server."""
@@ -230,13 +245,19 @@ def upload_file(server_id):
     if not version:
         return jsonify({'success': False, 'error': 'Version is required'}), 400
     
-    # Read file data
-    file_data = file.read()
+    # Size the upload without reading it; werkzeug spools large parts to disk
+    file_size = file.content_length
+    if not file_size:
+        file.stream.seek(0, os.SEEK_END)
+        file_size = file.stream.tell()
+        file.stream.seek(0)
     
+    # Pass the underlying stream through so the image is never read into memory
     result = upload_service.upload_file(
         server_id,
-        file_data,
+        file.stream,
         file.filename,
+        file_size,
         image_name,
         version,
         changelog,
@@ -261,3 +282,17 @@ def get_upload_history(server_id):
     result = upload_service.get_upload_history(server_id, limit)
     
     return jsonify(result), 200 if result['success'] else 400
+
+
+@upload_bp.route('/api/admin/upload-servers/<int:server_id>/uploads/<int:upload_id>/verify', methods=['POST'])
+def verify_upload(server_id, upload_id):
+    """Re-hash a stored upload and compare it with its recorded checksum."""
+    token, ip_address = get_auth_info()
+    
+    has_perm, session, error = check_permission_for_session(db, token, 'view_upload_servers')
+    if not has_perm:
+        return jsonify({'success': False, 'error': error}), 403 if session else 401
+    
+    result = upload_service.verify_upload(server_id, upload_id)
+    
+    return jsonify(result), 200 if result['success'] else 400
@@ -2,12 +2,17 @@
 Main Flask application using refactored services architecture.
 This replaces the monolithic auth_service.py with a clean, modular structure.
 """
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 import os
 import toml
 from loguru import logger
 
+# Load environment variables before importing services: some read
+# module-level settings (e.g. SSH_MAX_SESSIONS) at import time
+from dotenv import load_dotenv
+load_dotenv(".env", override=True)
+
 # Import database
 from database import UserDatabase
 
@@ -31,6 +36,11 @@ import json
 from datetime import datetime
 from collections import deque
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Configure logger
 logger.add("manager_backend.log", rotation="500 MB", retention="10 days", level="INFO")
 
@@ -56,10 +66,6 @@ def add_app_log(level, message, username=None, ip_address=None):
     else:
         logger.info(f"{message} | User: {username} | IP: {ip_address}")
 
-# Load environment variables
-from dotenv import load_dotenv
-load_dotenv(".env", override=True)
-
 # Validate configuration before starting
 from utils.config_validator import validate_config, ConfigValidationError
 try:
@@ -90,7 +96,7 @@ auth_service = AuthService(db)
 user_service = UserService(db, nginx_config_file, agent_port)
 server_service = ServerService(db, agent_service, agent_port)
 ssh_service = SSHService(db)
-docker_service = DockerService(db, agent_service, agent_port)
+docker_service = DockerService(db, agent_service, agent_port, server_service)
 audit_service = AuditService(db)
 cleanup_service = CleanupService(db)
 container_service = ContainerService(agent_service)
@@ -273,8 +279,21 @@ def approve_user(user_id):
 def get_admin_users():
     """Get admin users endpoint."""
     try:
-        users = user_service.get_admin_users()
-        return jsonify({'success': True, 'users': users})
+        # Optional keyset paging: ?limit=N&after_id=<last id of previous page>
+        limit = request.args.get('limit', None, type=int)
+        if limit is not None and limit < 1:
+            limit = None
+        after_id = request.args.get('after_id', 0, type=int)
+        users = user_service.get_admin_users(limit=limit, after_id=after_id)
+        response = {'success': True}
+        if limit:
+            response['nextAfterId'] = users[-1].id if len(users) == limit else None
+        # orjson serializes the slotted rows directly; jsonify needs plain dicts
+        if orjson is not None:
+            response['users'] = users
+            return Response(orjson.dumps(response), mimetype='application/json')
+        response['users'] = [user.to_dict() for user in users]
+        return jsonify(response)
     except Exception as e:
         logger.error(f"Error fetching admin users: {e}")
         return jsonify({'success': False, 'error': 'Failed to fetch users'}), 500
@@ -339,6 +358,35 @@ def create_admin_user():
         return jsonify({'success': False, 'error': 'Failed to create user'}), 500
 
 
+@app.route('/api/admin/users/bulk', methods=['POST'])
+def bulk_create_admin_users():
+    """Bulk create admin users endpoint (user import)."""
+    # Require create_user permission
+    session, error_response, status_code = require_permission_auth('create_user')
+    if error_response:
+        return error_response, status_code
+    
+    try:
+        data = request.get_json() or {}
+        users = data.get('users')
+        if not isinstance(users, list) or not users:
+            return jsonify({'success': False, 'error': 'A non-empty users list is required'}), 400
+        
+        admin_username = session.get('username', 'admin')
+        ip_address = get_client_ip(request)
+        
+        result = user_service.bulk_create_admin_users(users, admin_username, ip_address)
+        
+        if result['success']:
+            return jsonify(result)
+        else:
+            return jsonify(result), 400
+            
+    except Exception as e:
+        logger.error(f"Error bulk creating users: {e}")
+        return jsonify({'success': False, 'error': 'Failed to create users'}), 500
+
+
 # Password reset endpoints
 @app.route('/api/admin/users/<int:user_id>/reset-password', methods=['POST'])
 def admin_reset_user_password(user_id):
@@ -620,7 +668,9 @@ def ssh_get_output(session_id):
     if error_response:
         return error_response, status_code
     
-    result = ssh_service.get_ssh_output(session_id)
+    since = request.args.get('since', None, type=int)
+    include_full = request.args.get('include_full', 'false').lower() in ('1', 'true')
+    result = ssh_service.get_ssh_output(session_id, since=since, include_full=include_full)
     
     if result['success']:
         return jsonify(result)
@@ -957,13 +1007,7 @@ def register_agent():
         return jsonify({'success': False, 'error': 'Agent IP required'}), 400
     
     try:
-        from utils.helpers import read_agents_file, write_agents_file
-        agents = read_agents_file()
-        
-        if agent_ip not in agents:
-            agents.append(agent_ip)
-            write_agents_file(agents)
-            
+        if server_service.register_agent(agent_ip):
             # Log agent registration
             db.log_audit_event(
                 'System',
@@ -988,13 +1032,7 @@ def unregister_agent():
         return jsonify({'success': False, 'error': 'Agent IP required'}), 400
     
     try:
-        from utils.helpers import read_agents_file, write_agents_file
-        agents = read_agents_file()
-        
-        if agent_ip in agents:
-            agents.remove(agent_ip)
-            write_agents_file(agents)
-            
+        if server_service.unregister_agent(agent_ip):
             # Log agent unregistration
             db.log_audit_event(
                 'System',
@@ -76,6 +76,10 @@ class UserDatabase:
         """Update user information."""
         return self.user_repo.update_user(user_id, update_data)
     
+    def update_user_approval(self, user_id, is_approved, redirect_url, metadata):
+        """Set approval status, redirect URL and metadata in one UPDATE."""
+        return self.user_repo.update_user_approval(user_id, is_approved, redirect_url, metadata)
+    
     def verify_login(self, email, password):
         """Verify user login credentials."""
         return self.user_repo.verify_login(email, password)
@@ -88,6 +92,34 @@ class UserDatabase:
         """Get all users."""
         return self.user_repo.get_all_users(exclude_admin)
     
+    def create_users_bulk(self, users):
+        """Insert many users in a single multi-row INSERT; returns per-row success."""
+        return self.user_repo.create_users_bulk(users)
+    
+    def get_existing_usernames(self, usernames):
+        """Return the subset of usernames that already exist."""
+        return self.user_repo.get_existing_usernames(usernames)
+    
+    def get_existing_emails(self, emails):
+        """Return the subset of emails that already exist."""
+        return self.user_repo.get_existing_emails(emails)
+    
+    def get_admin_listing_users(self, limit=100, after_id=0):
+        """Get one page of non-system users with only the admin listing columns."""
+        return self.user_repo.get_admin_listing_users(limit, after_id)
+    
+    def get_user_summary(self):
+        """Get user counts for the admin dashboard."""
+        return self.user_repo.get_user_summary()
+    
+    def iter_user_pages(self, limit=100, after_id=0):
+        """Iterate pages (lists) of non-system users for the admin listing."""
+        return self.user_repo.iter_user_pages(limit, after_id)
+    
+    def iter_users(self, limit=100, after_id=0):
+        """Iterate non-system users for the admin listing, one page in memory at a time."""
+        return self.user_repo.iter_users(limit, after_id)
+    
     # Session operations - delegate to SessionRepository
     def create_session(self, user_id, session_token, expires_at):
         """Create a new user session."""
@@ -110,6 +142,10 @@ class UserDatabase:
         """Log user actions for audit using username instead of user_id."""
         return self.audit_repo.log_audit_event(username, action_type, action_details, ip_address)
     
+    def log_audit_events_batch(self, events):
+        """Log several username-based audit events in one transaction."""
+        return self.audit_repo.log_audit_events_batch(events)
+    
     def get_audit_logs(self, username=None, limit=100):
         """Get audit logs with optional username filter."""
         return self.audit_repo.get_audit_logs(username, limit)
@@ -2,11 +2,17 @@
 
 import mysql.connector
 import json
+import os
 from typing import Dict, List
 from .base import DatabaseManager
 from .user_repository import UserRepository
 
 
+def audit_enabled() -> bool:
+    """Whether audit logging is on (AUDIT_ENABLED env, default true)."""
+    return os.getenv('AUDIT_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+
+
 class AuditRepository:
     """Repository class for audit log-related database operations."""
     
@@ -14,9 +20,13 @@ class AuditRepository:
         """Initialize audit repository."""
         self.db_manager = DatabaseManager()
         self.user_repo = UserRepository()
+        # Read once; constructed after the app loads .env
+        self.enabled = audit_enabled()
 
     def log_audit(self, user_id: int, action_type: str, action_details: Dict, ip_address: str):
         """Log user actions for audit."""
+        if not self.enabled:
+            return
         query = """
         INSERT INTO audit_log (user_id, action_type, action_details, ip_address)
         VALUES (%s, %s, %s, %s)
@@ -36,22 +46,63 @@ class AuditRepository:
             cursor.close()
             conn.close()
     
-    def log_audit_event(self, username: str, action_type: str, action_details: Dict, ip_address: str):
-        """Log user actions for audit using username instead of user_id."""
-        # Get user_id from username
+    def _resolve_user_id(self, username: str) -> int:
+        """Map a username to the user_id recorded in the audit log."""
         user = self.user_repo.get_user_by_username(username)
         if user:
-            user_id = user['id']
-        else:
-            # For system actions, create or get system user
-            if username.lower() == 'system':
-                user_id = self.user_repo.get_or_create_system_user()
-            else:
-                # If user not found, try to use admin as fallback
-                admin_user = self.user_repo.get_user_by_username('admin')
-                user_id = admin_user['id'] if admin_user else self.user_repo.get_or_create_system_user()
-        
+            return user['id']
+        # For system actions, create or get system user
+        if username.lower() == 'system':
+            return self.user_repo.get_or_create_system_user()
+        # If user not found, try to use admin as fallback
+        admin_user = self.user_repo.get_user_by_username('admin')
+        return admin_user['id'] if admin_user else self.user_repo.get_or_create_system_user()
+    
+    def log_audit_event(self, username: str, action_type: str, action_details: Dict, ip_address: str):
+        """Log user actions for audit using username instead of user_id."""
+        if not self.enabled:
+            return
+        user_id = self._resolve_user_id(username)
         self.log_audit(user_id, action_type, action_details, ip_address)
+    
+    def log_audit_events_batch(self, events: List[Dict]):
+        """
+        Log several username-based audit events in one transaction.
+        
+        Each event holds username, action_type, action_details and ip_address.
+        """
+        if not events or not self.enabled:
+            return
+        
+        user_ids = {}
+        rows = []
+        for event in events:
+            username = event['username']
+            if username not in user_ids:
+                user_ids[username] = self._resolve_user_id(username)
+            rows.append((
+                user_ids[username],
+                event['action_type'],
+                # AuditEventWriter hands over details already serialized
+                event['action_details'] if isinstance(event['action_details'], str)
+                else json.dumps(event['action_details']),
+                event.get('ip_address')
+            ))
+        
+        query = """
+        INSERT INTO audit_log (user_id, action_type, action_details, ip_address)
+        VALUES (%s, %s, %s, %s)
+        """
+        
+        conn = self.db_manager.get_connection()
+        try:
+            cursor = conn.cursor()
+            # mysql-connector rewrites executemany INSERTs into a single multi-row statement
+            cursor.executemany(query, rows)
+            conn.commit()
+        finally:
+            cursor.close()
+            conn.close()
 
     def get_audit_logs(self, username: str = None, limit: int = 100) -> List[Dict]:
         """Get audit logs with optional username filter."""
@@ -89,6 +89,8 @@ class DatabaseManager:
             INDEX idx_ip_address (ip_address),
             INDEX idx_access_time (access_time),
             INDEX idx_session_token (session_token),
+            INDEX idx_access_time_ip_user (access_time, ip_address, user_id),
+            INDEX idx_ip_access_time (ip_address, access_time),
             FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE SET NULL
         );
 
@@ -271,6 +273,44 @@ class DatabaseManager:
         except mysql.connector.Error as e:
             print(f"Migration warning (may be safe to ignore): {e}")
 
+        # Earlier builds stored user metadata JSON-encoded twice (a JSON string
+        # holding the object); unwrap those rows so readers parse them once
+        try:
+            cursor.execute("""
+                UPDATE users
+                SET metadata = CAST(JSON_UNQUOTE(metadata) AS JSON)
+                WHERE JSON_TYPE(metadata) = 'STRING'
+                AND JSON_VALID(JSON_UNQUOTE(metadata))
+            """)
+            if cursor.rowcount:
+                conn.commit()
+                print(f"Migration completed: unwrapped double-encoded metadata for {cursor.rowcount} users")
+        except mysql.connector.Error as e:
+            print(f"Migration warning (may be safe to ignore): {e}")
+
+        # Composite indexes for the traffic analytics range scans
+        traffic_indexes = {
+            'idx_access_time_ip_user': '(access_time, ip_address, user_id)',
+            'idx_ip_access_time': '(ip_address, access_time)',
+        }
+        for index_name, columns in traffic_indexes.items():
+            try:
+                cursor.execute("""
+                    SELECT COUNT(*) FROM information_schema.statistics 
+                    WHERE table_schema = DATABASE() 
+                    AND table_name = 'user_access_logs' 
+                    AND index_name = %s
+                """, (index_name,))
+                result = cursor.fetchone()
+                
+                if result[0] == 0:
+                    print(f"Running migration: Adding {index_name} index...")
+                    cursor.execute(f"CREATE INDEX {index_name} ON user_access_logs {columns}")
+                    conn.commit()
+                    print(f"Migration completed: {index_name} index added")
+            except mysql.connector.Error as e:
+                print(f"Migration warning (may be safe to ignore): {e}")
+
     def _create_default_admin(self):
         """Create default admin user if it doesn't exist."""
         from .user_repository import UserRepository
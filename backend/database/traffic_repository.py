@@ -5,6 +5,21 @@ from datetime import datetime, timedelta
 import mysql.connector
 from .base import DatabaseManager
 
+# Rollup periods computed in SQL: (bucket column, bucket expression, result key).
+# Weeks start on Monday; buckets are returned as ISO strings.
+PERIOD_BUCKETS = {
+    'weekly': (
+        'week_start',
+        "CAST(DATE_SUB(DATE(access_time), INTERVAL WEEKDAY(access_time) DAY) AS CHAR)",
+        'weekly_stats'
+    ),
+    'monthly': (
+        'month',
+        "LEFT(CAST(DATE(access_time) AS CHAR), 7)",
+        'monthly_stats'
+    ),
+}
+
 
 class TrafficRepository:
     """Repository for user traffic and access analytics."""
@@ -76,8 +91,14 @@ class TrafficRepository:
                             start_date: datetime = None, 
                             end_date: datetime = None,
                             ip_filter: str = None,
-                            user_filter: str = None) -> Dict[str, Any]:
-        """Get comprehensive traffic analytics."""
+                            user_filter: str = None,
+                            period: str = 'daily') -> Dict[str, Any]:
+        """
+        Get comprehensive traffic analytics.
+        
+        For 'weekly' and 'monthly' periods the rollup is grouped in SQL and
+        returned under 'weekly_stats' or 'monthly_stats' next to the daily rows.
+        """
         if start_date is None:
             start_date = datetime.now() - timedelta(days=30)
         if end_date is None:
@@ -121,6 +142,28 @@ class TrafficRepository:
             cursor.execute(query, params)
             daily_stats = cursor.fetchall()
 
+            period_stats = None
+            if period in PERIOD_BUCKETS:
+                bucket_column, bucket_expr, _ = PERIOD_BUCKETS[period]
+                period_query = f"""
+                SELECT 
+                    {bucket_expr} as {bucket_column},
+                    COUNT(*) as total_requests,
+                    COUNT(DISTINCT ip_address) as unique_ips,
+                    COUNT(DISTINCT user_id) as unique_users,
+                    AVG(COALESCE(duration_seconds, 0)) as avg_duration,
+                    SUM(bytes_sent) as total_bytes_sent,
+                    SUM(bytes_received) as total_bytes_received,
+                    COUNT(CASE WHEN status_code >= 400 THEN 1 END) as error_count
+                FROM user_access_logs ual
+                LEFT JOIN users u ON ual.user_id = u.id
+                WHERE {where_clause}
+                GROUP BY {bucket_column}
+                ORDER BY {bucket_column} DESC
+                """
+                cursor.execute(period_query, params)
+                period_stats = cursor.fetchall()
+
             # Get top IPs
             top_ips_query = f"""
             SELECT 
@@ -171,6 +214,22 @@ class TrafficRepository:
             cursor.execute(hourly_query, params)
             hourly_distribution = cursor.fetchall()
 
+            # Window-wide totals; distinct visitors cannot be merged from per-day counts
+            summary_query = f"""
+            SELECT 
+                COUNT(*) as total_requests,
+                COUNT(DISTINCT ip_address) as total_unique_ips,
+                COUNT(DISTINCT user_id) as total_unique_users,
+                COUNT(DISTINCT DATE(access_time)) as active_days,
+                AVG(COALESCE(duration_seconds, 0)) as avg_session_duration,
+                COUNT(CASE WHEN status_code >= 400 THEN 1 END) as total_errors
+            FROM user_access_logs ual
+            LEFT JOIN users u ON ual.user_id = u.id
+            WHERE {where_clause}
+            """
+            cursor.execute(summary_query, params)
+            summary_totals = cursor.fetchone() or {}
+
             # Get endpoint statistics
             endpoint_query = f"""
             SELECT 
@@ -188,17 +247,21 @@ class TrafficRepository:
             cursor.execute(endpoint_query, params)
             endpoint_stats = cursor.fetchall()
 
-            return {
+            analytics = {
                 'daily_stats': daily_stats,
                 'top_ips': top_ips,
                 'top_users': top_users,
                 'hourly_distribution': hourly_distribution,
                 'endpoint_stats': endpoint_stats,
+                'summary_totals': summary_totals,
                 'date_range': {
                     'start_date': start_date.isoformat(),
                     'end_date': end_date.isoformat()
                 }
             }
+            if period_stats is not None:
+                analytics[PERIOD_BUCKETS[period][2]] = period_stats
+            return analytics
 
         except mysql.connector.Error as e:
             print(f"Error getting traffic analytics: {e}")
@@ -207,8 +270,37 @@ class TrafficRepository:
             cursor.close()
             conn.close()
 
-    def get_user_sessions(self, user_id: int = None, ip_address: str = None) -> List[Dict[str, Any]]:
-        """Get detailed user session information."""
+    def get_endpoint_stats(self, start_date: datetime, end_date: datetime,
+                           limit: int = 20) -> List[Dict[str, Any]]:
+        """Get the most requested endpoints in a window with a single aggregate query."""
+        query = """
+        SELECT 
+            endpoint,
+            COUNT(*) as request_count,
+            AVG(COALESCE(duration_seconds, 0)) as avg_duration,
+            COUNT(CASE WHEN status_code >= 400 THEN 1 END) as error_count
+        FROM user_access_logs
+        WHERE access_time BETWEEN %s AND %s AND endpoint IS NOT NULL
+        GROUP BY endpoint
+        ORDER BY request_count DESC
+        LIMIT %s
+        """
+
+        conn = self.db_manager.get_connection()
+        try:
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute(query, (start_date, end_date, limit))
+            return cursor.fetchall()
+        except mysql.connector.Error as e:
+            print(f"Error getting endpoint stats: {e}")
+            return []
+        finally:
+            cursor.close()
+            conn.close()
+
+    def get_user_sessions(self, user_id: int = None, ip_address: str = None,
+                          since: datetime = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """Get detailed user session information, optionally only sessions started at or after since."""
         where_conditions = []
         params = []
 
@@ -222,6 +314,13 @@ class TrafficRepository:
 
         where_clause = "WHERE " + " AND ".join(where_conditions) if where_conditions else ""
 
+        # Filter on the aggregated start so sessions spanning the cutoff keep their real start
+        having_clause = ""
+        if since:
+            having_clause = "HAVING session_start >= %s"
+            params.append(since)
+        params.append(limit)
+
         query = f"""
         SELECT 
             ual.session_token,
@@ -237,8 +336,9 @@ class TrafficRepository:
         LEFT JOIN users u ON ual.user_id = u.id
         {where_clause}
         GROUP BY ual.session_token, ual.ip_address, u.username, u.email
+        {having_clause}
         ORDER BY session_start DESC
-        LIMIT 100
+        LIMIT %s
         """
 
         conn = self.db_manager.get_connection()
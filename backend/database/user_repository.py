@@ -3,10 +3,19 @@
 import mysql.connector
 import hashlib
 import json
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Set
 from .base import DatabaseManager
 
 
+def _encode_metadata(metadata) -> str:
+    """Serialize metadata for the JSON column; pre-serialized JSON is passed through."""
+    if isinstance(metadata, (bytes, bytearray)):
+        return metadata.decode()
+    if isinstance(metadata, str):
+        return metadata
+    return json.dumps(metadata)
+
+
 class UserRepository:
     """Repository class for user-related database operations."""
     
@@ -36,7 +45,7 @@ class UserRepository:
                 'is_admin': user_data.get('is_admin', False),
                 'is_approved': user_data.get('is_approved', False),
                 'user_type': user_type,
-                'metadata': json.dumps(metadata)
+                'metadata': _encode_metadata(metadata)
             })
             conn.commit()
             return True
@@ -47,6 +56,89 @@ class UserRepository:
             cursor.close()
             conn.close()
 
+    def create_users_bulk(self, users: List[Dict]) -> List[bool]:
+        """Insert many users in one multi-row INSERT and return per-row success.
+
+        If a row violates a UNIQUE key the batch is rolled back and the rows are
+        inserted one at a time, so only the clashing rows fail.
+        """
+        if not users:
+            return []
+        query = """
+        INSERT INTO users (username, password, email, is_admin, is_approved, user_type, metadata)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+        """
+        rows = [
+            (
+                user_data['username'],
+                user_data['password'],
+                user_data['email'],
+                user_data.get('is_admin', False),
+                user_data.get('is_approved', False),
+                user_data.get('user_type') or ('admin' if user_data.get('is_admin', False) else 'regular'),
+                _encode_metadata(user_data.get('metadata', {}))
+            )
+            for user_data in users
+        ]
+        conn = self.db_manager.get_connection()
+        cursor = conn.cursor()
+        created: List[bool] = []
+        try:
+            try:
+                cursor.executemany(query, rows)
+                conn.commit()
+                return [True] * len(rows)
+            except mysql.connector.IntegrityError as e:
+                print(f"Duplicate in bulk user insert, retrying row by row: {e}")
+                conn.rollback()
+            for row in rows:
+                try:
+                    cursor.execute(query, row)
+                    conn.commit()
+                    created.append(True)
+                except mysql.connector.IntegrityError as e:
+                    print(f"Error creating user {row[0]}: {e}")
+                    conn.rollback()
+                    created.append(False)
+            return created
+        except mysql.connector.Error as e:
+            print(f"Error bulk creating users: {e}")
+            conn.rollback()
+            return created + [False] * (len(rows) - len(created))
+        finally:
+            cursor.close()
+            conn.close()
+
+    def get_existing_usernames(self, usernames: List[str]) -> Set[str]:
+        """Return which of the given usernames already exist, in one query."""
+        if not usernames:
+            return set()
+        placeholders = ', '.join(['%s'] * len(usernames))
+        query = f"SELECT username FROM users WHERE username IN ({placeholders})"
+        conn = self.db_manager.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(query, tuple(usernames))
+            return {row[0] for row in cursor.fetchall()}
+        finally:
+            cursor.close()
+            conn.close()
+
+    def get_existing_emails(self, emails: List[str]) -> Set[str]:
+        """Return which of the given emails already exist, in one query."""
+        if not emails:
+            return set()
+        placeholders = ', '.join(['%s'] * len(emails))
+        query = f"SELECT email FROM users WHERE email IN ({placeholders})"
+        conn = self.db_manager.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(query, tuple(emails))
+            return {row[0] for row in cursor.fetchall()}
+        finally:
+            cursor.close()
+            conn.close()
+
     def get_user_by_username(self, username: str) -> Optional[Dict]:
         """Get user by username."""
         query = "SELECT * FROM users WHERE username = %s"
@@ -112,7 +204,7 @@ class UserRepository:
             if field in update_data:
                 if field == 'metadata':  # Handle metadata separately
                     update_fields.append(f"{field} = %s")
-                    values.append(json.dumps(update_data[field]))  # Convert dict to JSON string
+                    values.append(_encode_metadata(update_data[field]))
                 else:
                     update_fields.append(f"{field} = %s")
                     values.append(update_data[field])
@@ -136,6 +228,23 @@ class UserRepository:
             cursor.close()
             conn.close()
 
+    def update_user_approval(self, user_id: int, is_approved: bool, redirect_url: str, metadata) -> bool:
+        """Write the approval outcome with a fixed UPDATE (no per-call query building)."""
+        query = "UPDATE users SET is_approved = %s, redirect_url = %s, metadata = %s WHERE id = %s"
+        
+        conn = self.db_manager.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(query, (is_approved, redirect_url, _encode_metadata(metadata), user_id))
+            conn.commit()
+            return True
+        except mysql.connector.Error as e:
+            print(f"Error updating user approval: {e}")
+            return False
+        finally:
+            cursor.close()
+            conn.close()
+
     def verify_login(self, email: str, password: str) -> Optional[Dict]:
         """Verify user login credentials."""
         hashed_password = hashlib.sha256(password.encode()).hexdigest()
@@ -195,6 +304,63 @@ class UserRepository:
             cursor.close()
             conn.close()
 
+    def get_admin_listing_users(self, limit: int = 100, after_id: int = 0) -> List[Dict]:
+        """Get one page of admin listing columns with id > after_id, excluding the system user."""
+        # container_name is the legacy fallback name (container-<first 2 chars>-<id:03d>);
+        # MySQL won't allow a generated column over the AUTO_INCREMENT id, so build it here
+        query = """
+        SELECT id, username, email, is_admin, is_approved, user_type, metadata,
+               CONCAT('container-', LOWER(LEFT(username, 2)), '-',
+                      IF(id < 1000, LPAD(id, 3, '0'), id)) AS container_name
+        FROM users
+        WHERE id > %s AND BINARY username <> 'System' AND (status IS NULL OR status <> 'system')
+        ORDER BY id
+        LIMIT %s
+        """
+        
+        conn = self.db_manager.get_connection()
+        try:
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute(query, (after_id, limit))
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+            conn.close()
+
+    def get_user_summary(self) -> Dict[str, int]:
+        """Count all rows, non-system users and approved non-system users in one query."""
+        query = """
+        SELECT COUNT(*) AS total_rows,
+               COALESCE(SUM(BINARY username <> 'System' AND (status IS NULL OR status <> 'system')), 0) AS total_users,
+               COALESCE(SUM(BINARY username <> 'System' AND (status IS NULL OR status <> 'system') AND is_approved), 0) AS approved_users
+        FROM users
+        """
+        
+        conn = self.db_manager.get_connection()
+        try:
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute(query)
+            row = cursor.fetchone()
+            return {key: int(value) for key, value in row.items()}
+        finally:
+            cursor.close()
+            conn.close()
+
+    def iter_user_pages(self, limit: int = 100, after_id: int = 0) -> Iterator[List[Dict]]:
+        """Yield admin listing rows one page at a time using keyset pagination on id."""
+        while True:
+            page = self.get_admin_listing_users(limit, after_id)
+            if page:
+                yield page
+            if len(page) < limit:
+                return
+            after_id = page[-1]['id']
+
+    def iter_users(self, limit: int = 100, after_id: int = 0) -> Iterator[Dict]:
+        """Yield admin listing rows page by page using keyset pagination on id."""
+        for page in self.iter_user_pages(limit, after_id):
+            yield from page
+
     def get_or_create_system_user(self) -> int:
         """Get or create a system user for audit logging."""
         # First try to get existing system user
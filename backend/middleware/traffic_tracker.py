@@ -108,21 +108,23 @@ class TrafficTracker:
         if not session_token:
             return
             
+        now = datetime.now()
         with self.session_lock:
-            if session_token not in self.active_sessions:
-                self.active_sessions[session_token] = {
-                    'start_time': datetime.now(),
+            # Single lookup per request; the entry is created on first sight
+            session_info = self.active_sessions.get(session_token)
+            if session_info is None:
+                session_info = self.active_sessions[session_token] = {
+                    'start_time': now,
                     'ip_address': request_data['ip_address'],
                     'user_id': request_data.get('user_id'),
-                    'last_activity': datetime.now()
+                    'last_activity': now
                 }
-                
-                # Update request data with session start
-                request_data['session_start'] = self.active_sessions[session_token]['start_time']
             else:
                 # Update last activity
-                self.active_sessions[session_token]['last_activity'] = datetime.now()
-                request_data['session_start'] = self.active_sessions[session_token]['start_time']
+                session_info['last_activity'] = now
+            
+            # Update request data with session start
+            request_data['session_start'] = session_info['start_time']
     
     def _log_access_async(self, access_data: Dict[str, Any]):
         """Log access data asynchronously."""
@@ -144,24 +146,26 @@ class TrafficTracker:
         cutoff_time = datetime.now() - timedelta(minutes=inactive_threshold_minutes)
         
         with self.session_lock:
-            inactive_sessions = []
-            for session_token, session_info in self.active_sessions.items():
-                if session_info['last_activity'] < cutoff_time:
-                    inactive_sessions.append(session_token)
+            # Keep each entry alongside its token so the update loop needs no re-lookup
+            inactive_sessions = [
+                (session_token, session_info)
+                for session_token, session_info in self.active_sessions.items()
+                if session_info['last_activity'] < cutoff_time
+            ]
             
             # Update database with session end times
             if inactive_sessions:
                 try:
                     from database.traffic_repository import TrafficRepository
                     traffic_repo = TrafficRepository()
+                    active_sessions = self.active_sessions
                     
-                    for session_token in inactive_sessions:
-                        session_info = self.active_sessions[session_token]
+                    for session_token, session_info in inactive_sessions:
                         traffic_repo.update_session_end(
                             session_token, 
                             session_info['last_activity']
                         )
-                        del self.active_sessions[session_token]
+                        del active_sessions[session_token]
                         
                 except Exception as e:
                     print(f"Error cleaning up sessions: {e}")
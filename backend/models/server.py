@@ -45,6 +45,33 @@ class ServerStats:
     total_disk_usage: float
 
 
+@dataclass(slots=True)
+class ServerInfoRow:
+    
+    id: str
+    ip: str
+    status: str  # online, offline
+    cpu: float
+    memory: float
+    disk: float
+    uptime: str
+    containers: int
+    lastSeen: float
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'id': self.id,
+            'ip': self.ip,
+            'status': self.status,
+            'cpu': self.cpu,
+            'memory': self.memory,
+            'disk': self.disk,
+            'uptime': self.uptime,
+            'containers': self.containers,
+            'lastSeen': self.lastSeen
+        }
+
+
 @dataclass
 class AgentInfo:
     
@@ -0,0 +1,35 @@
+from dataclasses import dataclass
+from typing import Dict, Any, Optional
+
+
+@dataclass(slots=True)
+class AdminUserRow:
+
+    id: str
+    name: str
+    email: str
+    role: str
+    container: str
+    containerStatus: str
+    resources: Dict[str, str]
+    server: str
+    serverLocation: str
+    status: str
+    isNewRegistration: bool
+    serviceUrls: Dict[str, Optional[str]]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'id': self.id,
+            'name': self.name,
+            'email': self.email,
+            'role': self.role,
+            'container': self.container,
+            'containerStatus': self.containerStatus,
+            'resources': self.resources,
+            'server': self.server,
+            'serverLocation': self.serverLocation,
+            'status': self.status,
+            'isNewRegistration': self.isNewRegistration,
+            'serviceUrls': self.serviceUrls
+        }
@@ -2,6 +2,7 @@ import socket
 import json
 from loguru import logger
 import requests
+from requests.adapters import HTTPAdapter
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import time
 from typing import List, Optional, Dict, Any
@@ -9,12 +10,20 @@ from typing import List, Optional, Dict, Any
 from models.server import ServerResources, AgentInfo
 from models.docker import DockerImage, DockerImagesResponse, DockerImageDetailsResponse
 
+# Keep-alive connections held per agent host by the shared HTTP session
+AGENT_POOL_MAXSIZE = 200
+
 
 class AgentService:
     
     def __init__(self, agent_port: int = 5000, timeout: int = 5):
         self.agent_port = agent_port
         self.timeout = timeout
+        # Shared session so repeated refreshes reuse TCP connections to each agent
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=AGENT_POOL_MAXSIZE, pool_maxsize=AGENT_POOL_MAXSIZE)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
 
     def query_agent_resources(self, agent_ip: str) -> Optional[Dict[str, Any]]:
         try:
@@ -23,7 +32,7 @@ class AgentService:
             url = f"http://{agent_ip}:{self.agent_port}/get_resources"
 
             # Use shorter timeout for faster failure detection
-            response = requests.get(url, timeout =self.timeout)
+            response = self.session.get(url, timeout =self.timeout)
             if response.status_code == 200:
                 logger.debug(f"Successfully queried resources from agent {agent_ip}:{self.agent_port}, response: {response.json()}")
                 return response.json()
@@ -47,17 +56,18 @@ class AgentService:
             return resources
         return None
 
-    def query_available_agents(self, server_list: List[str], max_workers: int = 10, timeout_per_agent: int = None) -> List[Dict[str, Any]]:
+    def query_available_agents(self, server_list: List[str], max_workers: int = 10, timeout_per_agent: int = None) -> Dict[str, Dict[str, Any]]:
         if timeout_per_agent is None:
             timeout_per_agent = self.timeout
             
         if not server_list:
             logger.warning("No servers provided to query")
-            return []
+            return {}
 
         logger.debug(f"Querying {len(server_list)} agents concurrently with {max_workers} workers")
         
-        available_agents = []
+        # Keyed by agent IP so callers can look up resources without re-indexing
+        available_agents = {}
         
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
             future_to_server = {
@@ -70,7 +80,7 @@ class AgentService:
                 try:
                     result = future.result(timeout=timeout_per_agent)
                     if result:
-                        available_agents.append(result)
+                        available_agents[server_ip] = result
                         logger.debug(f"Successfully queried agent {server_ip}")
                     else:
                         logger.debug(f"Agent {server_ip} not available")
@@ -85,7 +95,7 @@ class AgentService:
             logger.debug(f"Querying Docker images from: {agent_ip}:{self.agent_port}")
             
             url = f"http://{agent_ip}:{self.agent_port}/get_docker_images"
-            response = requests.get(url, timeout =self.timeout)
+            response = self.session.get(url, timeout =self.timeout)
             
             if response.status_code == 200:
                 return response.json()
@@ -108,7 +118,7 @@ class AgentService:
             logger.debug(f"Querying Docker image details for {image_id} from: {agent_ip}:{self.agent_port}")
             
             url = f"http://{agent_ip}:{self.agent_port}/get_docker_image_details/{image_id}"
-            response = requests.get(url, timeout =self.timeout)
+            response = self.session.get(url, timeout =self.timeout)
             
             if response.status_code == 200:
                 return response.json()
@@ -131,7 +141,7 @@ class AgentService:
             logger.info(f"Deleting Docker image {image_id} from: {agent_ip}:{self.agent_port}")
             
             url = f"http://{agent_ip}:{self.agent_port}/delete_docker_image/{image_id}"
-            response = requests.delete(url, json={'force': force}, timeout=self.timeout)
+            response = self.session.delete(url, json={'force': force}, timeout=self.timeout)
             
             if response.status_code == 200:
                 return response.json()
@@ -186,7 +196,7 @@ class AgentService:
             
             url = f"http://{agent_ip}:{self.agent_port}/api/containers/{container_name}/status"
             
-            response = requests.get(url, timeout =self.timeout)
+            response = self.session.get(url, timeout =self.timeout)
             if response.status_code == 200:
                 result = response.json()
                 logger.debug(f"Container status response: {result}")
@@ -211,7 +221,7 @@ class AgentService:
             
             url = f"http://{agent_ip}:{self.agent_port}/api/containers/{container_name}/ports"
             
-            response = requests.get(url, timeout=self.timeout)
+            response = self.session.get(url, timeout=self.timeout)
             if response.status_code == 200:
                 result = response.json()
                 logger.debug(f"Port info response: {result}")
@@ -235,7 +245,7 @@ class AgentService:
             
             url = f"http://{agent_ip}:{self.agent_port}/api/containers/{container_name}/{action}"
             
-            response = requests.post(url, timeout =self.timeout)
+            response = self.session.post(url, timeout =self.timeout)
             if response.status_code == 200:
                 result = response.json()
                 logger.debug(f"Container {action} response: {result}")
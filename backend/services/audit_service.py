@@ -1,8 +1,143 @@
 import json
+import time
+import queue
+import atexit
+import threading
 from typing import List, Dict, Any, Optional
 from loguru import logger
 
 from database import UserDatabase
+from database.audit_repository import audit_enabled
+
+AUDIT_BATCH_SIZE = 100
+AUDIT_FLUSH_INTERVAL = 0.05
+AUDIT_MAX_ATTEMPTS = 3
+# Seconds before the first retry of a failed event; doubles on each further attempt
+AUDIT_RETRY_BACKOFF = 1.0
+
+
+class AuditEventWriter:
+    """
+    Persist audit events from a background thread so callers never wait on MySQL.
+    
+    Events are collected into batches of up to ``batch_size`` or whatever arrives
+    within ``flush_interval`` seconds, then written with a single multi-row insert.
+    If a batch fails its rows are written one at a time, and only the rows that
+    still fail are retried with backoff, so one bad event cannot sink the rest.
+    """
+    
+    def __init__(self, db: UserDatabase, batch_size: int = AUDIT_BATCH_SIZE,
+                 flush_interval: float = AUDIT_FLUSH_INTERVAL):
+        self.db = db
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        # With AUDIT_ENABLED off, submit() is a no-op and no writer thread is started;
+        # callers check ``enabled`` before building event payloads
+        self.enabled = audit_enabled()
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        # Failed events waiting for their retry_at time; owned by the writer thread
+        self._retry: List[Dict[str, Any]] = []
+        self._retry_lock = threading.Lock()
+        if self.enabled:
+            self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+            self._thread.start()
+            atexit.register(self.flush)
+    
+    def submit(self, username: str, action_type: str, action_details: Dict[str, Any],
+               ip_address: Optional[str] = None):
+        """Queue an audit event; same arguments as ``UserDatabase.log_audit_event``."""
+        if not self.enabled:
+            return
+        # Serialize now so an unserializable payload is rejected here, not in a batch
+        try:
+            details_json = json.dumps(action_details)
+        except (TypeError, ValueError) as e:
+            logger.error(f"Skipping audit event {action_type} for {username}: details not serializable: {e}")
+            return
+        self._queue.put({
+            'username': username,
+            'action_type': action_type,
+            'action_details': details_json,
+            'ip_address': ip_address,
+            'attempts': 0
+        })
+    
+    def _take_due_retries(self) -> List[Dict[str, Any]]:
+        now = time.monotonic()
+        with self._retry_lock:
+            due = [event for event in self._retry if event['retry_at'] <= now]
+            if due:
+                self._retry = [event for event in self._retry if event['retry_at'] > now]
+        return due
+    
+    def _retry_wait(self) -> Optional[float]:
+        """Seconds until the next retry is due, or None to block until an event arrives."""
+        with self._retry_lock:
+            if not self._retry:
+                return None
+            next_at = min(event['retry_at'] for event in self._retry)
+        return max(next_at - time.monotonic(), 0)
+    
+    def _run(self):
+        while True:
+            batch = self._take_due_retries()
+            if not batch:
+                try:
+                    batch.append(self._queue.get(timeout=self._retry_wait()))
+                except queue.Empty:
+                    continue
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._write(batch)
+    
+    def _write(self, batch: List[Dict[str, Any]]):
+        try:
+            self.db.log_audit_events_batch(batch)
+            return
+        except Exception as e:
+            logger.error(f"Error writing {len(batch)} audit events: {e}")
+        
+        # Isolate the bad rows: write the batch one event at a time
+        failed = batch
+        if len(batch) > 1:
+            failed = []
+            for event in batch:
+                try:
+                    self.db.log_audit_events_batch([event])
+                except Exception as e:
+                    logger.error(f"Error writing audit event {event['action_type']} for {event['username']}: {e}")
+                    failed.append(event)
+        
+        for event in failed:
+            event['attempts'] += 1
+            if event['attempts'] < AUDIT_MAX_ATTEMPTS:
+                event['retry_at'] = time.monotonic() + AUDIT_RETRY_BACKOFF * 2 ** (event['attempts'] - 1)
+                with self._retry_lock:
+                    self._retry.append(event)
+            else:
+                logger.error(f"Dropping audit event {event['action_type']} for {event['username']}")
+    
+    def flush(self):
+        """Write any queued or pending-retry events synchronously (used at interpreter exit)."""
+        with self._retry_lock:
+            batch, self._retry = self._retry, []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if batch:
+            try:
+                self.db.log_audit_events_batch(batch)
+            except Exception as e:
+                logger.error(f"Error flushing {len(batch)} audit events: {e}")
 
 
 class AuditService:
@@ -6,20 +6,23 @@ from loguru import logger
 from database import UserDatabase
 from services.agent_service import AgentService
 from models.docker import DockerImage, DockerImagesResponse, DockerImageDetailsResponse, DockerImagesRequest
-from utils.helpers import read_agents_file
+from services.server_service import ServerService
 
 
 class DockerService:
     
-    def __init__(self, db: UserDatabase, agent_service: AgentService, agent_port: int):
+    def __init__(self, db: UserDatabase, agent_service: AgentService, agent_port: int,
+                 server_service: ServerService):
         self.db = db
         self.agent_service = agent_service
         self.agent_port = agent_port
+        # Agent list comes from ServerService's in-memory copy; agents.txt lags behind it
+        self.server_service = server_service
     
     def get_docker_images(self, server_id: Optional[str] = None) -> Dict[str, Any]:
         try:
             # Get list of available agents
-            agents = read_agents_file()
+            agents = self.server_service.get_agents()
             
             if server_id:
                 # Convert server_id to IP if it's in format 'server-192-168-68-108'
@@ -72,7 +75,7 @@ class DockerService:
     
     def get_docker_image_details(self, server_id: str, image_id: str) -> Dict[str, Any]:
         try:
-            agents = read_agents_file()
+            agents = self.server_service.get_agents()
             
             # Convert server_id to IP if it's in format 'server-192-168-68-108'
             agent_ip = server_id
@@ -99,7 +102,7 @@ class DockerService:
     def delete_docker_image(self, server_id: str, image_id: str, force: bool = False) -> Dict[str, Any]:
         """Delete a Docker image from a specific server."""
         try:
-            agents = read_agents_file()
+            agents = self.server_service.get_agents()
             
             # Convert server_id to IP if it's in format 'server-192-168-68-108'
             agent_ip = server_id
@@ -127,14 +130,13 @@ class DockerService:
         """
         try:
             # Get list of available agents
-            agents = read_agents_file()
+            agents = self.server_service.get_agents()
             
-            # Query servers for basic info
-            servers_resources = self.agent_service.query_available_agents(agents, self.agent_port)
+            # Query servers for basic info, keyed by agent IP
+            resource_map = self.agent_service.query_available_agents(agents, self.agent_port)
             
             # Create server list with status information
             servers_list = []
-            resource_map = {res['server_id']: res for res in servers_resources}
             
             for agent_ip in agents:
                 if agent_ip in resource_map:
@@ -191,7 +193,7 @@ class DockerService:
                 'total_images': total_images,
                 'total_size': total_size,
                 'servers_with_docker': servers_with_docker,
-                'total_servers': len(read_agents_file())
+                'total_servers': len(self.server_service.get_agents())
             }
         
         except Exception as e:
@@ -1,14 +1,66 @@
 import time
-import os
-from typing import List, Dict, Any, Optional
+import atexit
+import threading
+from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
 from loguru import logger
 
 from database import UserDatabase
 from services.agent_service import AgentService
-from models.server import ServerInfo, ServerResources, ServerStats, ServerActionRequest, AddServerRequest
+from models.server import ServerInfoRow
 from utils.helpers import read_agents_file, write_agents_file
 from utils.validators import is_valid_ip
 
+# Trailing delay before in-memory agent list changes are written to agents.txt
+AGENTS_FLUSH_DELAY = 0.2
+
+# Fleet size from which usage percentages are computed with NumPy instead of per-agent Python
+VECTORIZE_MIN_AGENTS = 64
+
+# Constant fields shared by every offline server row; only id and ip vary
+_OFFLINE_TEMPLATE = {
+    'status': 'offline',
+    'cpu': 0,
+    'memory': 0,
+    'disk': 0,
+    'uptime': 'Offline',
+    'containers': 0,
+    'lastSeen': 0
+}
+
+
+def _online_row(server_id: str, ip: str, resource_data: Dict[str, Any],
+                memory_usage: float, disk_usage: float, last_seen: float) -> ServerInfoRow:
+    """Build the row for a responsive agent from its resource payload."""
+    return ServerInfoRow(
+        id=server_id,
+        ip=ip,
+        status='online',
+        cpu=round(resource_data.get('host_cpu_used', 0), 1),
+        memory=round(memory_usage, 1),
+        disk=round(disk_usage, 1),
+        uptime=resource_data.get('uptime', 'Unknown'),
+        containers=resource_data.get('running_containers', 0),
+        lastSeen=last_seen
+    )
+
+
+def _usage_percentages(resources: List[Dict[str, Any]]) -> List[Tuple[float, float]]:
+    """Return rounded (memory %, disk %) pairs for agent resource payloads, vectorized."""
+    count = len(resources)
+    total_mem = np.fromiter((r.get('total_memory', 1) for r in resources), dtype=np.float64, count=count)
+    used_mem = np.fromiter((r.get('host_memory_used', 0) for r in resources), dtype=np.float64, count=count)
+    total_disk = np.fromiter((r.get('total_disk', 1) for r in resources), dtype=np.float64, count=count)
+    used_disk = np.fromiter((r.get('used_disk', 0) for r in resources), dtype=np.float64, count=count)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mem_pct = np.where(total_mem > 0, used_mem / total_mem * 100.0, 0.0)
+        disk_pct = np.where(total_disk > 0, used_disk / total_disk * 100.0, 0.0)
+    np.round(mem_pct, 1, out=mem_pct)
+    np.round(disk_pct, 1, out=disk_pct)
+    
+    return list(zip(mem_pct.tolist(), disk_pct.tolist()))
+
 
 class ServerService:
     
@@ -21,6 +73,78 @@ class ServerService:
             'timestamp': 0,
             'cache_duration': 30
         }
+        # server_id <-> ip mappings, filled lazily by _server_id()
+        self._id_cache: Dict[str, str] = {}
+        self._id_to_ip: Dict[str, str] = {}
+        # In-memory agent list is authoritative; agents.txt is flushed on a debounce timer.
+        # Every agent-list read and write (including DockerService and the register/unregister
+        # endpoints) must go through get_agents/register_agent/unregister_agent.
+        self._agents_lock = threading.Lock()
+        self._agents_mem: List[str] = read_agents_file()
+        self._dirty = False
+        self._flush_timer: Optional[threading.Timer] = None
+        atexit.register(self.flush_agents)
+    
+    def get_agents(self) -> List[str]:
+        """Return a snapshot of the in-memory agent list."""
+        with self._agents_lock:
+            return list(self._agents_mem)
+    
+    def register_agent(self, ip: str) -> bool:
+        """Add an agent IP to the list; returns False if it was already registered."""
+        with self._agents_lock:
+            if ip in self._agents_mem:
+                return False
+            self._agents_mem.append(ip)
+            self._mark_agents_dirty()
+        self.invalidate_cache()
+        return True
+    
+    def unregister_agent(self, ip: str) -> bool:
+        """Remove an agent IP from the list; returns False if it was not registered."""
+        with self._agents_lock:
+            if ip not in self._agents_mem:
+                return False
+            self._agents_mem = [agent for agent in self._agents_mem if agent != ip]
+            self._mark_agents_dirty()
+            # Under the lock so a concurrent register_agent for this IP can't be undone
+            sid = self._id_cache.pop(ip, None)
+            if sid is not None:
+                self._id_to_ip.pop(sid, None)
+        self.invalidate_cache()
+        return True
+    
+    def _mark_agents_dirty(self):
+        """Schedule a trailing flush of the agent list. Caller must hold _agents_lock."""
+        self._dirty = True
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+        self._flush_timer = threading.Timer(AGENTS_FLUSH_DELAY, self.flush_agents)
+        self._flush_timer.daemon = True
+        self._flush_timer.start()
+    
+    def flush_agents(self) -> bool:
+        """Write the in-memory agent list to agents.txt if it has pending changes."""
+        with self._agents_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._dirty:
+                return True
+            if not write_agents_file(self._agents_mem):
+                logger.error("Failed to flush agents file, will retry on next change")
+                return False
+            self._dirty = False
+            return True
+    
+    def _server_id(self, ip: str) -> str:
+        """Return the frontend server id for an agent IP, caching both directions."""
+        sid = self._id_cache.get(ip)
+        if sid is None:
+            sid = f'server-{ip.replace(".", "-")}'
+            self._id_cache[ip] = sid
+            self._id_to_ip[sid] = ip
+        return sid
     
     def get_cached_server_data(self) -> Dict[str, Any]:
         current_time = time.time()
@@ -33,10 +157,11 @@ class ServerService:
         
         # Cache is expired or empty, fetch new data
         logger.info("Fetching fresh server data")
-        agents_list = read_agents_file()
+        agents_list = self.get_agents()
         
         # Query all agents concurrently (this is the optimization!)
-        servers_resources = self.agent_service.query_available_agents(agents_list, self.agent_port)
+        # Map of successful responses keyed by agent IP
+        resource_map = self.agent_service.query_available_agents(agents_list, self.agent_port)
         
         # Process the data
         servers_data = []
@@ -51,50 +176,36 @@ class ServerService:
             'maintenanceServersChange': 0
         }
         
-        # Create a map of successful responses
-        resource_map = {res['server_id']: res for res in servers_resources}
+        # Large fleets get their usage percentages in one vectorized pass, in agents_list order
+        usage_iter = None
+        if len(agents_list) >= VECTORIZE_MIN_AGENTS:
+            online_resources = [resource_map[ip] for ip in agents_list if ip in resource_map]
+            usage_iter = iter(_usage_percentages(online_resources))
         
         for agent_ip in agents_list:
-            if agent_ip in resource_map:
-                resource_data = resource_map[agent_ip]
-                status = 'online'
+            resource_data = resource_map.get(agent_ip)
+            if resource_data is not None:
                 stats_data['onlineServers'] += 1
                 
-                # Calculate usage percentages
-                memory_total = resource_data.get('total_memory', 1)
-                memory_used = resource_data.get('host_memory_used', 0)
-                memory_usage = (memory_used / memory_total * 100) if memory_total > 0 else 0
-                
-                disk_total = resource_data.get('total_disk', 1)
-                disk_used = resource_data.get('used_disk', 0)
-                disk_usage = (disk_used / disk_total * 100) if disk_total > 0 else 0
+                if usage_iter is not None:
+                    memory_usage, disk_usage = next(usage_iter)
+                else:
+                    # Calculate usage percentages
+                    memory_total = resource_data.get('total_memory', 1)
+                    memory_used = resource_data.get('host_memory_used', 0)
+                    memory_usage = (memory_used / memory_total * 100) if memory_total > 0 else 0
+                    
+                    disk_total = resource_data.get('total_disk', 1)
+                    disk_used = resource_data.get('used_disk', 0)
+                    disk_usage = (disk_used / disk_total * 100) if disk_total > 0 else 0
                 
-                # Create server info dict with all resource data
-                server_info = {
-                    'id': f'server-{agent_ip.replace(".", "-")}',
-                    'ip': agent_ip,
-                    'status': status,
-                    'cpu': round(resource_data.get('host_cpu_used', 0), 1),
-                    'memory': round(memory_usage, 1),
-                    'disk': round(disk_usage, 1),
-                    'uptime': resource_data.get('uptime', 'Unknown'),
-                    'containers': resource_data.get('running_containers', 0),
-                    'lastSeen': current_time
-                }
+                # Create server info row with all resource data
+                server_info = _online_row(self._server_id(agent_ip), agent_ip, resource_data,
+                                          memory_usage, disk_usage, current_time)
             else:
                 # Server is offline
                 stats_data['offlineServers'] += 1
-                server_info = {
-                    'id': f'server-{agent_ip.replace(".", "-")}',
-                    'ip': agent_ip,
-                    'status': 'offline',
-                    'cpu': 0,
-                    'memory': 0,
-                    'disk': 0,
-                    'uptime': 'Offline',
-                    'containers': 0,
-                    'lastSeen': 0
-                }
+                server_info = ServerInfoRow(id=self._server_id(agent_ip), ip=agent_ip, **_OFFLINE_TEMPLATE)
             
             servers_data.append(server_info)
         
@@ -111,9 +222,9 @@ class ServerService:
     
     def get_server_resources(self) -> List[Dict[str, Any]]:
         try:
-            agents_list = read_agents_file()
+            agents_list = self.get_agents()
             servers = self.agent_service.query_available_agents(agents_list, self.agent_port)
-            return servers if servers else []
+            return list(servers.values())
         except Exception as e:
             logger.error(f"Error fetching server resources: {e}")
             return []
@@ -122,7 +233,7 @@ class ServerService:
         try:
             # Use cached data for better performance
             cached_data = self.get_cached_server_data()
-            return cached_data['servers']
+            return [server.to_dict() for server in cached_data['servers']]
         except Exception as e:
             logger.error(f"Error fetching server data: {e}")
             return []
@@ -138,8 +249,8 @@ class ServerService:
     
     def perform_server_action(self, server_id: str, action: str, username: str, ip_address: str = None) -> Dict[str, Any]:
         try:
-            # Extract IP from server_id
-            server_ip = server_id.replace('server-', '').replace('-', '.')
+            # Resolve IP from server_id (fall back to parsing on a cold cache)
+            server_ip = self._id_to_ip.get(server_id) or server_id.replace('server-', '').replace('-', '.')
             
             # Handle delete action
             if action == 'delete':
@@ -170,24 +281,10 @@ class ServerService:
     def _delete_server(self, server_id: str, server_ip: str, username: str, ip_address: str = None) -> Dict[str, Any]:
         """Delete a server from the system."""
         try:
-            # Read existing agents (list of IP addresses as strings)
-            agents = read_agents_file()
-            
-            # Check if the server exists
-            if server_ip not in agents:
+            # Remove the server from the list; agents.txt is flushed by the debounce timer
+            if not self.unregister_agent(server_ip):
                 return {'success': False, 'error': f'Server {server_ip} not found'}
             
-            # Remove the server from the list
-            agents = [agent for agent in agents if agent != server_ip]
-            
-            # Write the updated agents file
-            if not write_agents_file(agents):
-                return {'success': False, 'error': 'Failed to update agents file'}
-            
-            # Clear cache to force refresh
-            self.cache['data'] = None
-            self.cache['timestamp'] = 0
-            
             # Log the deletion
             self.db.log_audit_event(
                 username=username,
@@ -217,7 +314,7 @@ class ServerService:
             # Validate required fields
             name = server_data.get('name', '').strip()
             ip = server_data.get('ip', '').strip()
-            port = server_data.get('port', '8511').strip()
+            port = str(server_data.get('port', '8511')).strip()
             description = server_data.get('description', '').strip()
             tags = server_data.get('tags', [])
             
@@ -239,22 +336,10 @@ class ServerService:
             except ValueError:
                 return {'success': False, 'error': 'Invalid port number'}
             
-            # Read existing agents
-            agents = read_agents_file()
-            
-            # Check if IP already exists
-            if ip in agents:
+            # Add new server to agents list; agents.txt is flushed by the debounce timer
+            if not self.register_agent(ip):
                 return {'success': False, 'error': 'Server with this IP already exists'}
             
-            # Add new server to agents list
-            agents.append(ip)
-            if not write_agents_file(agents):
-                return {'success': False, 'error': 'Failed to save server configuration'}
-            
-            # Invalidate cache so fresh data is fetched
-            self.cache['data'] = None
-            self.cache['timestamp'] = 0
-            
             # Log the action
             self.db.log_audit_event(
                 username=admin_username,
@@ -304,10 +389,10 @@ class ServerService:
             servers_list = []
             for server in servers_data:
                 servers_list.append({
-                    'id': server['id'],
-                    'ip': server['ip'],
-                    'status': server['status'],
-                    'name': f"Server {server['ip']}"
+                    'id': server.id,
+                    'ip': server.ip,
+                    'status': server.status,
+                    'name': f"Server {server.ip}"
                 })
             
             return servers_list
@@ -332,34 +417,35 @@ class ServerService:
             servers_list = []
             for server in servers_data:
                 # Calculate capacity utilization
-                cpu_utilization = server.get('cpu', 0)
-                memory_utilization = server.get('memory', 0)
+                cpu_utilization = server.cpu
+                memory_utilization = server.memory
                 
                 # Determine availability status
                 availability = 'available'
-                if server['status'] != 'online':
+                if server.status != 'online':
                     availability = 'unavailable'
                 elif cpu_utilization > 80 or memory_utilization > 80:
                     availability = 'limited'
                 
                 servers_list.append({
-                    'id': server['id'],
-                    'ip': server['ip'],
-                    'name': f"Server {server['ip']}",
-                    'status': server['status'],
-                    'location': self._get_server_location(server['ip']),
+                    'id': server.id,
+                    'ip': server.ip,
+                    'name': f"Server {server.ip}",
+                    'status': server.status,
+                    'location': self._get_server_location(server.ip),
                     'availability': availability,
                     'capacity': {
                         'cpu_usage': cpu_utilization,
                         'memory_usage': memory_utilization,
-                        'containers': server.get('containers', 0),
+                        'containers': server.containers,
                         'max_containers': 10  # Default limit
                     },
+                    # Capacity details are not part of the cached row; report defaults
                     'resources': {
-                        'cpu_cores': server.get('cpu_cores', 4),
-                        'total_memory': server.get('total_memory', 8),
-                        'remaining_cpu': server.get('remaining_cpu', 2),
-                        'remaining_memory': server.get('remaining_memory', 4)
+                        'cpu_cores': 4,
+                        'total_memory': 8,
+                        'remaining_cpu': 2,
+                        'remaining_memory': 4
                     }
                 })
             
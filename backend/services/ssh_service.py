@@ -1,31 +1,326 @@
 import paramiko
 import threading
-import uuid
-import queue
+import secrets
+import collections
 import os
 import socket
-from typing import Dict, Any, Optional, List
+import hashlib
+import functools
+import time
+import selectors
+import asyncio
+from typing import Dict, Any, Optional, List, Callable, Deque
 from loguru import logger
 
 from database import UserDatabase
 from models.ssh import SSHConnectionInfo, SSHSessionStatus, SSHCommandRequest, SSHCommandResponse, SSHConnectRequest
 from utils.helpers import clean_terminal_output
+from services.audit_service import AuditEventWriter
+
+try:
+    import hussh
+except ImportError:
+    hussh = None
+
+try:
+    import asyncssh
+except ImportError:
+    asyncssh = None
+
+# Upper bound on shell channels multiplexed over one shared transport (sshd MaxSessions)
+SSH_MAX_SESSIONS = int(os.getenv('SSH_MAX_SESSIONS', '10'))
+
+# Idle authenticated transports kept per recently used target, and how long a target stays warm.
+# Opt-in: warming keeps transports open after disconnect and re-authenticates them with
+# credentials held in memory for up to SSH_WARM_WINDOW.
+SSH_MIN_WARM = int(os.getenv('SSH_MIN_WARM', '0'))
+SSH_WARM_WINDOW = 3600
+
+# Seconds between keepalives on shared transports (also the warmer's refresh period)
+SSH_KEEPALIVE_INTERVAL = 30
+
+# SSH_BACKEND=hussh runs commands through the Rust-backed hussh bindings when installed
+SSH_BACKEND = os.getenv('SSH_BACKEND', 'paramiko').lower()
+if SSH_BACKEND == 'hussh' and hussh is None:
+    logger.warning("SSH_BACKEND=hussh requested but hussh is not installed, falling back to paramiko")
+USE_HUSSH = SSH_BACKEND == 'hussh' and hussh is not None
+
+# SSH_BACKEND=asyncssh multiplexes every interactive shell on one asyncio event loop
+if SSH_BACKEND == 'asyncssh' and asyncssh is None:
+    logger.warning("SSH_BACKEND=asyncssh requested but asyncssh is not installed, falling back to paramiko")
+USE_ASYNCSSH = SSH_BACKEND == 'asyncssh' and asyncssh is not None
+
+# Seconds to wait for an asyncssh connection and shell to open
+ASYNCSSH_CONNECT_TIMEOUT = 40
+
+# Output chunks buffered per session before the oldest are dropped
+SSH_OUTPUT_MAX_CHUNKS = 4096
+
+# Bytes of output history kept per session for cursor reads; older bytes are dropped
+SSH_HISTORY_MAX_BYTES = 1024 * 1024
+
+# Seconds between liveness sweeps, and how long a dead session stays visible before it is reaped
+SSH_SWEEP_INTERVAL = 1.0
+SSH_REAP_GRACE = 10.0
+
+# Bytes requested per channel recv; large reads drain bursts in fewer calls
+SSH_RECV_SIZE = 65536
+
+
+class SSHOutputReader:
+    """
+    Single background thread that reads every registered shell channel.
+    
+    Paramiko channels expose a pollable fileno(), so one selector (epoll on Linux)
+    wakes only for channels with pending data instead of a polling thread per session.
+    The thread blocks without a timeout; registrations poke a wakeup pipe.
+    """
+    
+    def __init__(self):
+        self._selector = selectors.DefaultSelector()
+        self._wakeup_r, self._wakeup_w = os.pipe()
+        os.set_blocking(self._wakeup_r, False)
+        os.set_blocking(self._wakeup_w, False)
+        self._selector.register(self._wakeup_r, selectors.EVENT_READ, data=None)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+    
+    def register(self, session: 'SSHSession'):
+        """Start reading a session's shell channel."""
+        self._selector.register(session.shell_fd, selectors.EVENT_READ, data=session)
+        try:
+            os.write(self._wakeup_w, b'\0')
+        except BlockingIOError:
+            # A wakeup is already pending
+            pass
+    
+    def unregister(self, session: 'SSHSession'):
+        """Stop reading a session's shell channel."""
+        try:
+            self._selector.unregister(session.shell_fd)
+        except (KeyError, ValueError):
+            pass
+    
+    def _drain_wakeup(self):
+        try:
+            while os.read(self._wakeup_r, 4096):
+                pass
+        except BlockingIOError:
+            pass
+    
+    def _run(self):
+        logger.debug("Starting SSH output reader thread")
+        while True:
+            try:
+                events = self._selector.select()
+            except Exception as e:
+                logger.error(f"SSH output selector failed: {e}")
+                continue
+            for key, _ in events:
+                session = key.data
+                if session is None:
+                    self._drain_wakeup()
+                    continue
+                if not session.read_ready():
+                    self.unregister(session)
+
+
+def _open_transport(host: str, port: int, username: str, password: Optional[str],
+                    key_path: Optional[str]) -> paramiko.Transport:
+    """Open and authenticate a new SSH transport."""
+    logger.debug(f"Attempting SSH connection to {username}@{host}:{port}")
+    if not (key_path and os.path.exists(key_path)) and not password:
+        raise Exception("No authentication method provided")
+    
+    sock = socket.create_connection((host, port), timeout=10)
+    transport = paramiko.Transport(sock)
+    # Configure connection parameters for stability
+    transport.banner_timeout = 30
+    transport.auth_timeout = 30
+    try:
+        # Host keys are accepted without verification, as with AutoAddPolicy
+        transport.start_client(timeout=10)
+        if key_path and os.path.exists(key_path):
+            # Use SSH key authentication
+            transport.auth_publickey(username, paramiko.PKey.from_path(key_path))
+        else:
+            # Use password authentication
+            transport.auth_password(username, password)
+    except Exception:
+        transport.close()
+        raise
+    return transport
+
+
+class _TransportCache:
+    """
+    Authenticated transports shared by sessions to the same target and credentials.
+    
+    Each shell is its own channel on a cached transport, so only the first session
+    pays for the TCP handshake, key exchange and authentication. Transports are
+    refcounted per open channel. Targets used within SSH_WARM_WINDOW keep
+    SSH_MIN_WARM idle transports authenticated and kept alive by a background
+    thread, so the next Connect skips the handshake entirely.
+    """
+    
+    def __init__(self, max_channels: int = SSH_MAX_SESSIONS, min_warm: int = SSH_MIN_WARM):
+        self.max_channels = max_channels
+        self.min_warm = min_warm
+        self._lock = threading.Lock()
+        # key -> list of [transport, open channel count]
+        self._entries: Dict[tuple, List[list]] = {}
+        # key -> transport factory and last acquire time, for targets worth keeping warm
+        self._factories: Dict[tuple, Callable[[], paramiko.Transport]] = {}
+        self._last_used: Dict[tuple, float] = {}
+        if self.min_warm > 0:
+            self._warmer = threading.Thread(target=self._warm_loop, daemon=True)
+            self._warmer.start()
+    
+    @staticmethod
+    def make_key(host: str, port: int, username: str, password: Optional[str],
+                 key_path: Optional[str]) -> tuple:
+        """Build a cache key; credentials are hashed so differing secrets never share a transport."""
+        credential_hash = hashlib.sha256(f"{password or ''}\0{key_path or ''}".encode()).hexdigest()
+        return (host, port, username, credential_hash)
+    
+    def _new_transport(self, factory: Callable[[], paramiko.Transport]) -> paramiko.Transport:
+        transport = factory()
+        transport.set_keepalive(SSH_KEEPALIVE_INTERVAL)
+        return transport
+    
+    def acquire(self, key: tuple, factory: Callable[[], paramiko.Transport]) -> paramiko.Transport:
+        """Reserve a channel on a live cached transport, building a new one with factory if needed."""
+        stale = []
+        transport = None
+        with self._lock:
+            # Factories capture credentials; only keep them when warming is enabled
+            if self.min_warm > 0:
+                self._factories[key] = factory
+                self._last_used[key] = time.monotonic()
+            entries = self._entries.get(key, [])
+            for entry in list(entries):
+                if not entry[0].is_active():
+                    entries.remove(entry)
+                    stale.append(entry[0])
+                    continue
+                if entry[1] < self.max_channels:
+                    entry[1] += 1
+                    transport = entry[0]
+                    break
+        for dead in stale:
+            dead.close()
+        if transport is not None:
+            return transport
+        
+        # Connect outside the lock so a slow handshake does not block other targets
+        transport = self._new_transport(factory)
+        with self._lock:
+            self._entries.setdefault(key, []).append([transport, 1])
+        return transport
+    
+    def release(self, key: tuple, transport: paramiko.Transport):
+        """Release a channel; idle transports beyond the warm quota, or dead ones, are closed."""
+        close = False
+        with self._lock:
+            entries = self._entries.get(key, [])
+            for entry in entries:
+                if entry[0] is transport:
+                    entry[1] -= 1
+                    if not transport.is_active():
+                        entries.remove(entry)
+                        close = True
+                    elif entry[1] <= 0:
+                        idle = sum(1 for other in entries if other[1] <= 0)
+                        if key not in self._factories or idle > self.min_warm:
+                            entries.remove(entry)
+                            close = True
+                    break
+            else:
+                close = True
+            if not entries:
+                self._entries.pop(key, None)
+        if close:
+            transport.close()
+    
+    def _warm_loop(self):
+        logger.debug("Starting SSH transport warmer thread")
+        while True:
+            time.sleep(SSH_KEEPALIVE_INTERVAL)
+            try:
+                self._warm()
+            except Exception as e:
+                logger.error(f"SSH transport warmer failed: {e}")
+    
+    def _warm(self):
+        """Prune dead or expired idle transports and top up warm targets."""
+        now = time.monotonic()
+        to_close = []
+        to_build = []
+        with self._lock:
+            for key in list(self._factories):
+                entries = self._entries.get(key, [])
+                expired = now - self._last_used[key] > SSH_WARM_WINDOW
+                for entry in list(entries):
+                    if not entry[0].is_active() or (expired and entry[1] <= 0):
+                        entries.remove(entry)
+                        to_close.append(entry[0])
+                if not entries:
+                    self._entries.pop(key, None)
+                if expired:
+                    del self._factories[key]
+                    del self._last_used[key]
+                    continue
+                idle = sum(1 for entry in entries if entry[1] <= 0)
+                to_build.extend([(key, self._factories[key])] * (self.min_warm - idle))
+        for transport in to_close:
+            transport.close()
+        
+        for key, factory in to_build:
+            try:
+                transport = self._new_transport(factory)
+            except Exception as e:
+                logger.debug(f"Could not warm SSH transport to {key[0]}:{key[1]}: {e}")
+                continue
+            with self._lock:
+                self._entries.setdefault(key, []).append([transport, 0])
+            logger.debug(f"Warmed SSH transport to {key[2]}@{key[0]}:{key[1]}")
 
 
 class SSHSession:
     
     def __init__(self, session_id: str, host: str, port: int, username: str, 
-                 password: Optional[str] = None, key_path: Optional[str] = None):
-        self.session_id = session_id
-        self.host = host
-        self.port = port
-        self.username = username
-        self.password = password
-        self.key_path = key_path
-        self.client = None
-        self.shell = None
-        self.output_queue = queue.Queue()
-        self.connected = False
+                 password: Optional[str] = None, key_path: Optional[str] = None,
+                 transport_cache: Optional[_TransportCache] = None,
+                 reader: Optional[SSHOutputReader] = None,
+                 max_output_chunks: int = SSH_OUTPUT_MAX_CHUNKS):
+        self.session_id: str = session_id
+        self.host: str = host
+        self.port: int = port
+        self.username: str = username
+        self.password: Optional[str] = password
+        self.key_path: Optional[str] = key_path
+        # Sessions to the same target share an authenticated transport through the cache
+        self.transport_cache = transport_cache
+        self.transport_key: tuple = _TransportCache.make_key(host, port, username, password, key_path)
+        self.transport: Optional[paramiko.Transport] = None
+        # Slot in SSHService's session listing arrays, -1 when not listed
+        self._registry_idx: int = -1
+        # Audit fields shared by every event this session logs
+        self._audit_base: Dict[str, Any] = {'server_ip': host, 'ssh_user': username, 'session_id': session_id}
+        self.hussh_conn = None
+        # Shared reader that drains the shell channel into output_queue
+        self.reader: Optional[SSHOutputReader] = reader
+        self.shell: Optional[paramiko.Channel] = None
+        self.shell_fd: Optional[int] = None
+        # Cleaned raw bytes; bounded so an unread session keeps only its most recent output
+        self.output_queue: Deque[bytes] = collections.deque(maxlen=max_output_chunks)
+        self._out_lock = threading.Lock()
+        # Serializes SSHService.get_ssh_output: drain, history buffer, base offset and cursor
+        self._history_lock = threading.Lock()
+        self.connected: bool = False
+        # Liveness as of the last SSHService sweep, and when the session was first seen dead
+        self._cached_alive: bool = False
+        self._dead_since: Optional[float] = None
         
     def connect(self) -> bool:
         """
@@ -34,43 +329,30 @@ class SSHSession:
         Returns:
             bool: True if connection successful
         """
-        logger.debug(f"Attempting SSH connection to {self.username}@{self.host}:{self.port}")
+        if USE_HUSSH:
+            return self._hussh_connect()
         try:
-            self.client = paramiko.SSHClient()
-            self.client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            
-            # Configure connection parameters for stability
-            connect_kwargs = {
-                'hostname': self.host,
-                'port': self.port,
-                'username': self.username,
-                'timeout': 10,
-                'banner_timeout': 30,
-                'auth_timeout': 30
-            }
-            
-            if self.key_path and os.path.exists(self.key_path):
-                # Use SSH key authentication
-                connect_kwargs['key_filename'] = self.key_path
-                self.client.connect(**connect_kwargs)
-            elif self.password:
-                # Use password authentication
-                connect_kwargs['password'] = self.password
-                self.client.connect(**connect_kwargs)
+            factory = functools.partial(
+                _open_transport, self.host, self.port, self.username, self.password, self.key_path
+            )
+            if self.transport_cache is not None:
+                self.transport = self.transport_cache.acquire(self.transport_key, factory)
             else:
-                raise Exception("No authentication method provided")
+                self.transport = factory()
             
-            # Create interactive shell
-            self.shell = self.client.invoke_shell()
+            # Create interactive shell as a new channel on the (possibly shared) transport
+            self.shell = self.transport.open_session()
+            self.shell.get_pty()
+            self.shell.invoke_shell()
             # Set a reasonable timeout for shell operations
             self.shell.settimeout(1.0)
             self.connected = True
             
-            # Start output reader thread
-            threading.Thread(target=self._read_output, daemon=True).start()
+            # Hand the channel to the shared output reader
+            self.shell_fd = self.shell.fileno()
+            self.reader.register(self)
             
             # Give a moment for initial output (like welcome message)
-            import time
             time.sleep(0.5)
             
             # Capture initial output
@@ -82,31 +364,63 @@ class SSHSession:
             return True
         except Exception as e:
             logger.error(f"SSH connection failed: {e}")
+            self.disconnect()
             return False
     
-    def _read_output(self):
-        """Read output from SSH shell in background thread."""
-        import time
-        logger.debug(f"Starting SSH output reader thread for {self.host}")
-        while self.connected and self.shell:
-            try:
-                if self.shell.recv_ready():
-                    raw_output = self.shell.recv(4096).decode('utf-8', errors='ignore')
-                    # Clean ANSI escape sequences and control characters
-                    cleaned_output = clean_terminal_output(raw_output)
-                    self.output_queue.put(cleaned_output)
-                    logger.debug(f"SSH output received from {self.host}: {len(raw_output)} chars -> {len(cleaned_output)} chars cleaned")
-                else:
-                    # Sleep briefly to prevent tight loop and reduce CPU usage
-                    time.sleep(0.1)
-            except socket.timeout:
-                # Timeout is expected, continue reading
-                continue
-            except Exception as e:
-                if self.connected:
-                    logger.error(f"Error reading SSH output from {self.host}: {e}")
-                break
-        logger.debug(f"SSH output reader thread exiting for {self.host}")
+    def _hussh_connect(self) -> bool:
+        """
+        Establish a hussh connection. Commands run one-shot via execute_command,
+        so there is no interactive shell or reader thread.
+        """
+        logger.debug(f"Attempting hussh connection to {self.username}@{self.host}:{self.port}")
+        try:
+            connect_kwargs = {
+                'host': self.host,
+                'port': self.port,
+                'username': self.username
+            }
+            if self.key_path and os.path.exists(self.key_path):
+                connect_kwargs['private_key'] = self.key_path
+            elif self.password:
+                connect_kwargs['password'] = self.password
+            else:
+                raise Exception("No authentication method provided")
+            
+            self.hussh_conn = hussh.Connection(**connect_kwargs)
+            self.connected = True
+            logger.debug(f"hussh connection established successfully to {self.host}")
+            return True
+        except Exception as e:
+            logger.error(f"hussh connection failed: {e}")
+            return False
+    
+    def read_ready(self) -> bool:
+        """
+        Read pending output from the shell channel. Called by SSHOutputReader.
+        
+        Returns:
+            bool: False once the channel is closed or failed
+        """
+        if not self.connected or not self.shell:
+            return False
+        try:
+            data = self.shell.recv(SSH_RECV_SIZE)
+            if not data:
+                logger.debug(f"SSH shell channel closed for {self.host}")
+                return False
+            # Clean ANSI escape sequences and control characters; stays bytes until get_output
+            cleaned_output = clean_terminal_output(data)
+            with self._out_lock:
+                self.output_queue.append(cleaned_output)
+            logger.debug(f"SSH output received from {self.host}: {len(data)} bytes -> {len(cleaned_output)} bytes cleaned")
+            return True
+        except socket.timeout:
+            # Spurious wakeup, keep the channel registered
+            return True
+        except Exception as e:
+            if self.connected:
+                logger.error(f"Error reading SSH output from {self.host}: {e}")
+            return False
     
     def execute_command(self, command: str) -> bool:
         """
@@ -118,15 +432,32 @@ class SSHSession:
         Returns:
             bool: True if command sent successfully
         """
+        if self.connected and self.hussh_conn is not None:
+            return self._hussh_execute(command)
         if not self.connected or not self.shell:
             return False
         try:
-            self.shell.send(command + '\n')
+            # sendall: a single send() may accept only part of a long command
+            self.shell.sendall((command + '\n').encode('utf-8'))
             return True
         except Exception as e:
             logger.error(f"Error executing SSH command: {e}")
             return False
     
+    def _hussh_execute(self, command: str) -> bool:
+        """Run a command over hussh and queue its output for get_output."""
+        try:
+            result = self.hussh_conn.execute(command)
+            output = (result.stdout or '') + (result.stderr or '')
+            if output:
+                cleaned_output = clean_terminal_output(output.encode('utf-8'))
+                with self._out_lock:
+                    self.output_queue.append(cleaned_output)
+            return True
+        except Exception as e:
+            logger.error(f"Error executing SSH command via hussh: {e}")
+            return False
+    
     def get_output(self) -> str:
         """
         Get accumulated output from SSH session.
@@ -134,26 +465,35 @@ class SSHSession:
         Returns:
             str: Output from SSH session
         """
-        output_lines = []
-        try:
-            while not self.output_queue.empty():
-                output_lines.append(self.output_queue.get_nowait())
-        except queue.Empty:
-            pass
-        return ''.join(output_lines)
+        # Swap in an empty deque so the lock covers one assignment, not a copy of every chunk
+        with self._out_lock:
+            chunks = self.output_queue
+            self.output_queue = collections.deque(maxlen=chunks.maxlen)
+        # Decode once per poll; multi-byte characters split across recvs are rejoined first
+        return b''.join(chunks).decode('utf-8', errors='ignore')
     
     def disconnect(self):
-        """
-        Close SSH connection and cleanup resources.
-        """
+        """Close SSH connection and cleanup resources."""
         logger.debug(f"Disconnecting SSH session to {self.host}")
         self.connected = False
+        if self.hussh_conn is not None:
+            try:
+                self.hussh_conn.close()
+            except Exception as e:
+                logger.debug(f"Error closing hussh connection to {self.host}: {e}")
+            self.hussh_conn = None
         if self.shell:
+            if self.reader is not None and self.shell_fd is not None:
+                self.reader.unregister(self)
             self.shell.close()
             self.shell = None
-        if self.client:
-            self.client.close()
-            self.client = None
+        if self.transport:
+            # A shared transport stays open while other sessions still have channels on it
+            if self.transport_cache is not None:
+                self.transport_cache.release(self.transport_key, self.transport)
+            else:
+                self.transport.close()
+            self.transport = None
         logger.debug(f"SSH session to {self.host} disconnected")
     
     def is_alive(self) -> bool:
@@ -163,18 +503,21 @@ class SSHSession:
         Returns:
             bool: True if connection is active
         """
-        if not self.connected or not self.client:
-            logger.debug(f"SSH session {self.session_id} not connected or no client")
+        if self.hussh_conn is not None:
+            return self.connected
+        
+        if not self.connected or not self.transport:
+            logger.debug(f"SSH session {self.session_id} not connected or no transport")
+            return False
+        
+        # The transport may be shared, so a closed shell channel means this session ended
+        if self.shell is None or self.shell.closed:
+            logger.debug(f"SSH session {self.session_id} shell channel closed")
             return False
         
         try:
             # Check transport status
-            transport = self.client.get_transport()
-            if transport is None:
-                logger.debug(f"SSH session {self.session_id} has no transport")
-                return False
-            
-            is_active = transport.is_active()
+            is_active = self.transport.is_active()
             logger.debug(f"SSH session {self.session_id} transport active: {is_active}")
             return is_active
         except Exception as e:
@@ -182,12 +525,257 @@ class SSHSession:
             return False
 
 
+class _AsyncSSHLoop:
+    """
+    A single asyncio event loop on a daemon thread that drives every asyncssh session.
+    
+    The Flask routes stay synchronous; they hand coroutines to this loop and wait
+    for the result, so sessions cost a task each rather than a thread.
+    """
+    
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self._thread.start()
+    
+    def run(self, coro, timeout: Optional[float] = None):
+        """Run a coroutine on the loop and block until it finishes."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+    
+    def call_soon(self, callback: Callable, *args):
+        """Schedule a plain callback on the loop thread."""
+        self.loop.call_soon_threadsafe(callback, *args)
+
+
+class AsyncSSHSession(SSHSession):
+    """
+    Interactive shell driven by asyncssh on the shared event loop.
+    
+    A pump task per session feeds the same bounded output queue as SSHSession,
+    so get_output and the service-level bookkeeping are shared.
+    """
+    
+    def __init__(self, session_id: str, host: str, port: int, username: str,
+                 password: Optional[str] = None, key_path: Optional[str] = None,
+                 loop: Optional[_AsyncSSHLoop] = None,
+                 max_output_chunks: int = SSH_OUTPUT_MAX_CHUNKS):
+        super().__init__(session_id, host, port, username, password, key_path,
+                         max_output_chunks=max_output_chunks)
+        self.loop = loop
+        self.conn = None
+        self.process = None
+        self._pump_task = None
+    
+    def connect(self) -> bool:
+        """
+        Establish SSH connection.
+        
+        Returns:
+            bool: True if connection successful
+        """
+        try:
+            return self.loop.run(self._connect(), timeout=ASYNCSSH_CONNECT_TIMEOUT)
+        except Exception as e:
+            logger.error(f"asyncssh connection failed: {e}")
+            self.disconnect()
+            return False
+    
+    async def _connect(self) -> bool:
+        logger.debug(f"Attempting asyncssh connection to {self.username}@{self.host}:{self.port}")
+        # Host keys are accepted without verification, as with AutoAddPolicy
+        connect_kwargs = {
+            'port': self.port,
+            'username': self.username,
+            'known_hosts': None,
+            'connect_timeout': 10
+        }
+        if self.key_path and os.path.exists(self.key_path):
+            connect_kwargs['client_keys'] = [self.key_path]
+        elif self.password:
+            connect_kwargs['password'] = self.password
+        else:
+            raise Exception("No authentication method provided")
+        
+        self.conn = await asyncssh.connect(self.host, **connect_kwargs)
+        # encoding=None keeps stdout as bytes for the bytes cleanup patterns
+        self.process = await self.conn.create_process(
+            term_type='vt100', encoding=None, stderr=asyncssh.STDOUT
+        )
+        self.connected = True
+        self._pump_task = asyncio.ensure_future(self._pump())
+        logger.debug(f"asyncssh connection established successfully to {self.host}")
+        return True
+    
+    async def _pump(self):
+        try:
+            while True:
+                data = await self.process.stdout.read(SSH_RECV_SIZE)
+                if not data:
+                    logger.debug(f"asyncssh shell closed for {self.host}")
+                    break
+                cleaned_output = clean_terminal_output(data)
+                with self._out_lock:
+                    self.output_queue.append(cleaned_output)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            if self.connected:
+                logger.error(f"Error reading asyncssh output from {self.host}: {e}")
+        finally:
+            self.connected = False
+    
+    def execute_command(self, command: str) -> bool:
+        """
+        Execute command in SSH shell.
+        
+        Args:
+            command: Command to execute
+            
+        Returns:
+            bool: True if command sent successfully
+        """
+        if not self.connected or self.process is None:
+            return False
+        try:
+            self.loop.call_soon(self.process.stdin.write, (command + '\n').encode('utf-8'))
+            return True
+        except Exception as e:
+            logger.error(f"Error executing SSH command via asyncssh: {e}")
+            return False
+    
+    def disconnect(self):
+        """Close SSH connection and cleanup resources."""
+        logger.debug(f"Disconnecting asyncssh session to {self.host}")
+        self.connected = False
+        if self._pump_task is not None:
+            self.loop.call_soon(self._pump_task.cancel)
+            self._pump_task = None
+        if self.conn is not None:
+            self.loop.call_soon(self.conn.close)
+            self.conn = None
+        self.process = None
+    
+    def is_alive(self) -> bool:
+        """
+        Check if SSH connection is still alive.
+        
+        Returns:
+            bool: True if connection is active
+        """
+        return self.connected and self.conn is not None
+
+
 class SSHService:
     
     def __init__(self, db: UserDatabase):
         self.db = db
         self.ssh_sessions: Dict[str, SSHSession] = {}
-        self.ssh_session_outputs: Dict[str, str] = {}
+        # Guards ssh_sessions lookups and removals only, never SSH I/O
+        self._sessions_lock = threading.Lock()
+        # Session listing kept as parallel arrays for get_ssh_sessions
+        self._registry_lock = threading.Lock()
+        self._ids: List[str] = []
+        self._hosts: List[str] = []
+        self._ports: List[int] = []
+        self._users: List[str] = []
+        self._connected: List[bool] = []
+        # Per-session UTF-8 output history; _session_offset is the absolute offset of its
+        # first byte, so cursors stay valid after old history is dropped
+        self.ssh_session_outputs: Dict[str, bytearray] = {}
+        self._session_offset: Dict[str, int] = {}
+        # Authenticated transports shared by sessions to the same target
+        self._transports = _TransportCache()
+        # One reader thread serves every session's shell channel
+        self._reader = SSHOutputReader()
+        self._audit = AuditEventWriter(db)
+        self._async_loop = _AsyncSSHLoop() if USE_ASYNCSSH else None
+        # Liveness is probed once per sweep instead of on every output poll
+        self._sweeper = threading.Thread(target=self._sweep_loop, daemon=True)
+        self._sweeper.start()
+    
+    def _get_session(self, session_id: str) -> Optional[SSHSession]:
+        """Look up a live session with a single dict probe."""
+        with self._sessions_lock:
+            return self.ssh_sessions.get(session_id)
+    
+    def _pop_session(self, session_id: str) -> Optional[SSHSession]:
+        """Remove a session atomically so only one caller tears it down."""
+        with self._sessions_lock:
+            self.ssh_session_outputs.pop(session_id, None)
+            self._session_offset.pop(session_id, None)
+            return self.ssh_sessions.pop(session_id, None)
+    
+    def _registry_add(self, ssh_session: SSHSession):
+        """Append a session to the listing arrays."""
+        with self._registry_lock:
+            ssh_session._registry_idx = len(self._ids)
+            self._ids.append(ssh_session.session_id)
+            self._hosts.append(ssh_session.host)
+            self._ports.append(ssh_session.port)
+            self._users.append(ssh_session.username)
+            self._connected.append(ssh_session.connected)
+    
+    def _registry_remove(self, ssh_session: SSHSession):
+        """Remove a session from the listing arrays by moving the tail entry into its slot."""
+        with self._registry_lock:
+            idx = ssh_session._registry_idx
+            if idx < 0:
+                return
+            last = len(self._ids) - 1
+            if idx != last:
+                self._ids[idx] = self._ids[last]
+                self._hosts[idx] = self._hosts[last]
+                self._ports[idx] = self._ports[last]
+                self._users[idx] = self._users[last]
+                self._connected[idx] = self._connected[last]
+                moved = self.ssh_sessions.get(self._ids[idx])
+                if moved is not None:
+                    moved._registry_idx = idx
+            self._ids.pop()
+            self._hosts.pop()
+            self._ports.pop()
+            self._users.pop()
+            self._connected.pop()
+            ssh_session._registry_idx = -1
+    
+    def _registry_set_connected(self, ssh_session: SSHSession, connected: bool):
+        """Record a session's latest connection state in the listing arrays."""
+        with self._registry_lock:
+            if ssh_session._registry_idx >= 0:
+                self._connected[ssh_session._registry_idx] = connected
+    
+    def _reap(self, ssh_session: SSHSession):
+        """Remove and close a dead session unless another caller already did."""
+        if self._pop_session(ssh_session.session_id) is ssh_session:
+            logger.warning(f"SSH session {ssh_session.session_id} is dead, cleaning up")
+            self._registry_remove(ssh_session)
+            ssh_session.disconnect()
+    
+    def _sweep_loop(self):
+        logger.debug("Starting SSH session sweeper thread")
+        while True:
+            time.sleep(SSH_SWEEP_INTERVAL)
+            try:
+                self._sweep()
+            except Exception as e:
+                logger.error(f"SSH session sweep failed: {e}")
+    
+    def _sweep(self):
+        """Refresh cached liveness for every session and reap ones dead past the grace period."""
+        now = time.monotonic()
+        with self._sessions_lock:
+            sessions = list(self.ssh_sessions.values())
+        for ssh_session in sessions:
+            alive = ssh_session.is_alive()
+            ssh_session._cached_alive = alive
+            self._registry_set_connected(ssh_session, alive)
+            if alive:
+                continue
+            # Keep dead sessions around briefly so pollers see connected=False
+            if ssh_session._dead_since is None:
+                ssh_session._dead_since = now
+            elif now - ssh_session._dead_since >= SSH_REAP_GRACE:
+                self._reap(ssh_session)
     
     def create_ssh_connection(self, server_id: str, ssh_config: Dict[str, Any], 
                             admin_username: str, ip_address: Optional[str] = None) -> Dict[str, Any]:
@@ -197,29 +785,51 @@ class SSHService:
             # Extract server IP from server_id
             server_ip = server_id.replace('server-', '').replace('-', '.')
             
+            host = ssh_config.get('host', server_ip)
+            port = int(ssh_config.get('port', 22))
+            username = ssh_config.get('username', 'root')
+            password = ssh_config.get('password')
+            key_path = ssh_config.get('key_path')
+            
             # Create SSH session
-            session_id = str(uuid.uuid4())
-            ssh_session = SSHSession(
-                session_id=session_id,
-                host=ssh_config.get('host', server_ip),
-                port=int(ssh_config.get('port', 22)),
-                username=ssh_config.get('username', 'root'),
-                password=ssh_config.get('password'),
-                key_path=ssh_config.get('key_path')
-            )
+            session_id = secrets.token_hex(16)
+            if USE_ASYNCSSH:
+                ssh_session = AsyncSSHSession(
+                    session_id=session_id,
+                    host=host,
+                    port=port,
+                    username=username,
+                    password=password,
+                    key_path=key_path,
+                    loop=self._async_loop
+                )
+            else:
+                ssh_session = SSHSession(
+                    session_id=session_id,
+                    host=host,
+                    port=port,
+                    username=username,
+                    password=password,
+                    key_path=key_path,
+                    transport_cache=self._transports,
+                    reader=self._reader
+                )
             
             if ssh_session.connect():
-                self.ssh_sessions[session_id] = ssh_session
+                ssh_session._cached_alive = True
+                with self._sessions_lock:
+                    self.ssh_sessions[session_id] = ssh_session
+                self._registry_add(ssh_session)
                 
                 # Log SSH connection
-                self.db.log_audit_event(
+                self._audit.submit(
                     username=admin_username,
                     action_type='ssh_connect',
                     action_details={
+                        **ssh_session._audit_base,
                         'message': f'SSH connection established to server {server_ip}',
                         'server_id': server_id,
-                        'server_ip': server_ip,
-                        'ssh_user': ssh_config.get('username', 'root')
+                        'server_ip': server_ip
                     },
                     ip_address=ip_address
                 )
@@ -242,21 +852,19 @@ class SSHService:
     def execute_ssh_command(self, session_id: str, command: str, admin_username: str, 
                           ip_address: Optional[str] = None) -> Dict[str, Any]:
         try:
-            if session_id not in self.ssh_sessions:
+            ssh_session = self._get_session(session_id)
+            if ssh_session is None:
                 return {'success': False, 'error': 'SSH session not found'}
             
-            ssh_session = self.ssh_sessions[session_id]
-            
             if ssh_session.execute_command(command):
                 # Log command execution
-                self.db.log_audit_event(
+                self._audit.submit(
                     username=admin_username,
                     action_type='ssh_command',
                     action_details={
+                        **ssh_session._audit_base,
                         'message': f'SSH command executed: {command}',
-                        'command': command,
-                        'session_id': session_id,
-                        'server_ip': ssh_session.host
+                        'command': command
                     },
                     ip_address=ip_address
                 )
@@ -272,29 +880,57 @@ class SSHService:
             logger.error(f"Error executing SSH command: {e}")
             return {'success': False, 'error': 'Failed to execute command'}
     
-    def get_ssh_output(self, session_id: str) -> Dict[str, Any]:
+    def get_ssh_output(self, session_id: str, since: Optional[int] = None,
+                       include_full: bool = False) -> Dict[str, Any]:
+        """
+        Drain new output for a session.
+        
+        Args:
+            session_id: SSH session ID
+            since: Cursor from a previous response; when given, output holds every
+                byte after it that is still in the history buffer
+            include_full: Also return the whole retained history as full_output
+        """
         try:
-            if session_id not in self.ssh_sessions:
+            ssh_session = self._get_session(session_id)
+            if ssh_session is None:
                 return {'success': False, 'error': 'SSH session not found'}
             
-            ssh_session = self.ssh_sessions[session_id]
-            output = ssh_session.get_output()
-            
-            # Store output for session
-            if session_id not in self.ssh_session_outputs:
-                self.ssh_session_outputs[session_id] = ""
-            
-            self.ssh_session_outputs[session_id] += output
+            # Concurrent polls of one session (two tabs, retries) must not interleave the
+            # drain with the buffer trim and offset update, or cursors skip or repeat bytes
+            with ssh_session._history_lock:
+                output = ssh_session.get_output()
+                
+                # Store output for session
+                buf = self.ssh_session_outputs.setdefault(session_id, bytearray())
+                base = self._session_offset.setdefault(session_id, 0)
+                if output:
+                    buf.extend(output.encode('utf-8'))
+                    overflow = len(buf) - SSH_HISTORY_MAX_BYTES
+                    if overflow > 0:
+                        del buf[:overflow]
+                        base += overflow
+                        self._session_offset[session_id] = base
+                cursor = base + len(buf)
+                
+                if since is not None:
+                    start = min(max(since - base, 0), len(buf))
+                    output = buf[start:].decode('utf-8', errors='ignore')
+                
+                full_output = buf.decode('utf-8', errors='ignore') if include_full else None
             
-            # Check if session is still alive
-            is_connected = ssh_session.is_alive()
+            # Liveness as of the last background sweep
+            is_connected = ssh_session._cached_alive
             
-            return {
+            result = {
                 'success': True,
                 'output': output,
-                'full_output': self.ssh_session_outputs[session_id],
+                'cursor': cursor,
                 'connected': is_connected
             }
+            if include_full:
+                result['full_output'] = full_output
+            return result
             
         except Exception as e:
             logger.error(f"Error getting SSH output: {e}")
@@ -306,21 +942,20 @@ class SSHService:
     
     def get_ssh_session_status(self, session_id: str) -> Dict[str, Any]:
         try:
-            if session_id not in self.ssh_sessions:
+            ssh_session = self._get_session(session_id)
+            if ssh_session is None:
                 return {
                     'success': False, 
                     'connected': False,
                     'error': 'SSH session not found'
                 }
             
-            ssh_session = self.ssh_sessions[session_id]
             is_alive = ssh_session.is_alive()
             
+            ssh_session._cached_alive = is_alive
             if not is_alive:
                 # Clean up dead session
-                logger.warning(f"SSH session {session_id} is dead, cleaning up")
-                self.ssh_sessions.pop(session_id, None)
-                self.ssh_session_outputs.pop(session_id, None)
+                self._reap(ssh_session)
             
             return {
                 'success': True,
@@ -339,28 +974,23 @@ class SSHService:
     def disconnect_ssh_session(self, session_id: str, admin_username: str, 
                              ip_address: Optional[str] = None) -> Dict[str, Any]:
         try:
-            if session_id not in self.ssh_sessions:
+            ssh_session = self._pop_session(session_id)
+            if ssh_session is None:
                 return {'success': False, 'error': 'SSH session not found'}
             
-            ssh_session = self.ssh_sessions[session_id]
             server_ip = ssh_session.host
+            self._registry_remove(ssh_session)
             
-            # Disconnect session
+            # Disconnect session; the shared transport stays up for other sessions
             ssh_session.disconnect()
             
-            # Clean up
-            del self.ssh_sessions[session_id]
-            if session_id in self.ssh_session_outputs:
-                del self.ssh_session_outputs[session_id]
-            
             # Log SSH disconnection
-            self.db.log_audit_event(
+            self._audit.submit(
                 username=admin_username,
                 action_type='ssh_disconnect',
                 action_details={
-                    'message': f'SSH session disconnected from server {server_ip}',
-                    'session_id': session_id,
-                    'server_ip': server_ip
+                    **ssh_session._audit_base,
+                    'message': f'SSH session disconnected from server {server_ip}'
                 },
                 ip_address=ip_address
             )
@@ -376,16 +1006,19 @@ class SSHService:
     
     def get_ssh_sessions(self) -> List[Dict[str, Any]]:
         try:
-            sessions = []
-            for session_id, ssh_session in self.ssh_sessions.items():
-                sessions.append({
-                    'session_id': session_id,
-                    'host': ssh_session.host,
-                    'port': ssh_session.port,
-                    'username': ssh_session.username,
-                    'connected': ssh_session.connected
-                })
-            return sessions
+            with self._registry_lock:
+                return [
+                    {
+                        'session_id': session_id,
+                        'host': host,
+                        'port': port,
+                        'username': username,
+                        'connected': connected
+                    }
+                    for session_id, host, port, username, connected in zip(
+                        self._ids, self._hosts, self._ports, self._users, self._connected
+                    )
+                ]
         except Exception as e:
             logger.error(f"Error getting SSH sessions: {e}")
             return []
@@ -1,21 +1,72 @@
 """Service for managing guest OS uploads and file operations."""
 
+import io
 import os
+import asyncio
 import json
+import queue
+import socket
 import hashlib
 import logging
+import time
 import tempfile
+import threading
 import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from pathlib import PurePosixPath
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, BinaryIO, Iterator, Tuple
 import paramiko
+from cachetools import TTLCache
 from stat import S_ISDIR, S_ISREG
 
 from database.upload_repository import UploadServerRepository, GuestOSUploadRepository
 from database import UserDatabase
+from services.audit_service import AuditEventWriter
+
+try:
+    import asyncssh
+except ImportError:
+    asyncssh = None
 
 logger = logging.getLogger(__name__)
 
+# UPLOAD_SSH_BACKEND=asyncssh browses and uploads through asyncssh, independent of SSH_BACKEND
+UPLOAD_SSH_BACKEND = os.getenv('UPLOAD_SSH_BACKEND', 'paramiko').lower()
+if UPLOAD_SSH_BACKEND == 'asyncssh' and asyncssh is None:
+    logger.warning("UPLOAD_SSH_BACKEND=asyncssh requested but asyncssh is not installed, falling back to paramiko")
+USE_ASYNCSSH_UPLOADS = UPLOAD_SSH_BACKEND == 'asyncssh' and asyncssh is not None
+
+# Uploads are copied in 1 MiB chunks so image files never sit in memory whole
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Outstanding read requests when hashing a remote image (bounds buffered data to ~2 MiB)
+SFTP_PREFETCH_REQUESTS = 64
+
+# Large socket buffers and SSH channel window so SFTP isn't RTT-bound on WAN links
+SSH_SOCKET_BUFFER_SIZE = 32 * 1024 * 1024
+SSH_WINDOW_SIZE = 4 * 1024 * 1024
+
+# Server rows (with credentials) are reused for this long between DB reads
+SERVER_CACHE_TTL = 30
+
+# Idle SSH/SFTP sessions kept per upload server and how long they may sit unused
+SFTP_POOL_MAX_IDLE = 4
+SFTP_POOL_IDLE_TTL = 300
+
+# SFTP channels opened on one transport for recursive deletes (bounded by sshd MaxSessions)
+SFTP_PARALLEL_CHANNELS = 8
+
+# version.json is written compact unless pretty output is requested for debugging
+VERSION_FILE_PRETTY = os.getenv('VERSION_FILE_PRETTY', 'false').lower() == 'true'
+
+# Upper bound on concurrent probes when testing every server at once
+TEST_CONNECTIONS_MAX_WORKERS = 32
+
+# Local uploads at least this large get their disk space reserved up front
+LOCAL_PREALLOCATE_THRESHOLD = 64 * 1024 * 1024
+
 
 class UploadService:
     """Service for managing upload servers and guest OS uploads."""
@@ -24,6 +75,26 @@ class UploadService:
         self.server_repo = UploadServerRepository()
         self.upload_repo = GuestOSUploadRepository()
         self.db = UserDatabase()
+        # Audit rows are written in the background so requests don't wait on MySQL
+        self._audit = AuditEventWriter(self.db)
+        # server_id -> [(last_used, ssh, sftp)] of idle sessions ready for reuse
+        self._pool: Dict[int, List[Tuple[float, paramiko.SSHClient, paramiko.SFTPClient]]] = {}
+        self._pool_lock = threading.Lock()
+        self._server_cache = TTLCache(maxsize=128, ttl=SERVER_CACHE_TTL)
+        self._server_cache_lock = threading.Lock()
+        # server_id -> parsed private key, so key text is never written to disk
+        self._pkey_cache: Dict[int, paramiko.PKey] = {}
+        # Local version.json parent directories already known to exist
+        self._mkdir_cache = set()
+        # base_path -> os.path.realpath(base_path) for the local access checks
+        self._realpath_cache: Dict[str, str] = {}
+        # asyncssh transfers share one long-lived event loop; server_id ->
+        # (last_used, connection, sftp) is only touched from that loop's thread
+        self._async_clients: Dict[int, Tuple[float, Any, Any]] = {}
+        self._async_loop = None
+        if USE_ASYNCSSH_UPLOADS:
+            self._async_loop = asyncio.new_event_loop()
+            threading.Thread(target=self._async_loop.run_forever, daemon=True).start()
     
     # ==================== Server Management ====================
     
@@ -35,7 +106,7 @@ class UploadService:
         try:
             server_id = self.server_repo.create_server(data, created_by=user_id)
             if server_id:
-                self.db.log_audit_event(
+                self._audit.submit(
                     admin_username,
                     'create_upload_server',
                     {
@@ -76,7 +147,8 @@ class UploadService:
         """Update an upload server."""
         try:
             if self.server_repo.update_server(server_id, data):
-                self.db.log_audit_event(
+                self._invalidate_server(server_id)
+                self._audit.submit(
                     admin_username,
                     'update_upload_server',
                     {
@@ -101,7 +173,8 @@ class UploadService:
                 return {'success': False, 'error': 'Server not found'}
             
             if self.server_repo.delete_server(server_id):
-                self.db.log_audit_event(
+                self._invalidate_server(server_id)
+                self._audit.submit(
                     admin_username,
                     'delete_upload_server',
                     {
@@ -119,7 +192,7 @@ class UploadService:
     def test_connection(self, server_id: int) -> Dict[str, Any]:
         """Test connection to an upload server."""
         try:
-            server = self.server_repo.get_server_with_credentials(server_id)
+            server = self._get_server(server_id)
             if not server:
                 return {'success': False, 'error': 'Server not found'}
             
@@ -137,6 +210,25 @@ class UploadService:
             logger.error(f"Error testing connection: {e}")
             return {'success': False, 'error': str(e)}
     
+    def test_all_connections(self) -> Dict[str, Any]:
+        """Test every active upload server concurrently."""
+        try:
+            servers = self.server_repo.get_all_servers()
+            if not servers:
+                return {'success': True, 'results': {}}
+            
+            # Probes are network-bound (up to the 10s timeout each), so total time is the slowest one
+            workers = min(TEST_CONNECTIONS_MAX_WORKERS, len(servers))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = pool.map(lambda server: self.test_connection(server['id']), servers)
+                return {
+                    'success': True,
+                    'results': {server['id']: result for server, result in zip(servers, results)}
+                }
+        except Exception as e:
+            logger.error(f"Error testing connections: {e}")
+            return {'success': False, 'error': str(e)}
+    
     def _test_sftp_connection(self, server: Dict[str, Any]) -> Dict[str, Any]:
         """Test SFTP connection to server."""
         try:
@@ -152,10 +244,7 @@ class UploadService:
             
             if server.get('ssh_key'):
                 # Use SSH key
-                key_file = tempfile.NamedTemporaryFile(mode='w', delete=False)
-                key_file.write(server['ssh_key'])
-                key_file.close()
-                connect_kwargs['key_filename'] = key_file.name
+                connect_kwargs['pkey'] = self._load_pkey(server)
             elif server.get('password'):
                 connect_kwargs['password'] = server['password']
             
@@ -173,9 +262,6 @@ class UploadService:
             sftp.close()
             ssh.close()
             
-            if server.get('ssh_key'):
-                os.unlink(key_file.name)
-            
             return {'success': True, 'message': 'Connection successful'}
             
         except paramiko.AuthenticationException:
@@ -190,12 +276,12 @@ class UploadService:
     def browse_files(self, server_id: int, path: str = None) -> Dict[str, Any]:
         """Browse files and folders on an upload server."""
         try:
-            server = self.server_repo.get_server_with_credentials(server_id)
+            server = self._get_server(server_id)
             if not server:
                 return {'success': False, 'error': 'Server not found'}
             
             base_path = server['base_path']
-            browse_path = os.path.join(base_path, path) if path else base_path
+            browse_path = self._join_path(server, base_path, path) if path else base_path
             
             if server['protocol'] == 'local':
                 return self._browse_local(browse_path, base_path)
@@ -214,20 +300,23 @@ class UploadService:
             
             # Security check - ensure path is within base_path
             real_browse = os.path.realpath(browse_path)
-            real_base = os.path.realpath(base_path)
+            real_base = self._real_base(base_path)
             if not real_browse.startswith(real_base):
                 return {'success': False, 'error': 'Access denied'}
             
+            # scandir gets the entry type from the directory read itself, so
+            # only one stat per entry is needed
             items = []
-            for name in os.listdir(browse_path):
-                full_path = os.path.join(browse_path, name)
-                stat = os.stat(full_path)
-                items.append({
-                    'name': name,
-                    'type': 'directory' if os.path.isdir(full_path) else 'file',
-                    'size': stat.st_size if os.path.isfile(full_path) else None,
-                    'modified': datetime.fromtimestamp(stat.st_mtime).isoformat()
-                })
+            with os.scandir(browse_path) as entries:
+                for entry in entries:
+                    st = entry.stat()
+                    is_dir = S_ISDIR(st.st_mode)
+                    items.append({
+                        'name': entry.name,
+                        'type': 'directory' if is_dir else 'file',
+                        'size': st.st_size if S_ISREG(st.st_mode) else None,
+                        'modified': datetime.fromtimestamp(st.st_mtime).isoformat()
+                    })
             
             # Sort: directories first, then files
             items.sort(key=lambda x: (0 if x['type'] == 'directory' else 1, x['name'].lower()))
@@ -248,28 +337,33 @@ class UploadService:
     def _browse_sftp(self, server: Dict[str, Any], browse_path: str, 
                     base_path: str) -> Dict[str, Any]:
         """Browse files via SFTP."""
-        ssh = None
-        sftp = None
         try:
-            ssh = self._get_ssh_connection(server)
-            sftp = ssh.open_sftp()
+            if self._async_loop is not None:
+                entries = self._run_async(server, self._listdir_sftp_async(server, browse_path))
+            else:
+                with self._sftp_session(server) as sftp:
+                    entries = [(a.filename, a.st_mode, a.st_size, a.st_mtime)
+                               for a in sftp.listdir_attr(browse_path)]
             
             items = []
-            for attr in sftp.listdir_attr(browse_path):
+            for name, mode, size, mtime in entries:
+                # Servers may omit attributes; without a mode the entry is treated as a file
                 items.append({
-                    'name': attr.filename,
-                    'type': 'directory' if S_ISDIR(attr.st_mode) else 'file',
-                    'size': attr.st_size if S_ISREG(attr.st_mode) else None,
-                    'modified': datetime.fromtimestamp(attr.st_mtime).isoformat()
+                    'name': name,
+                    'type': 'directory' if mode is not None and S_ISDIR(mode) else 'file',
+                    'size': size if mode is None or S_ISREG(mode) else None,
+                    'modified': datetime.fromtimestamp(mtime).isoformat() if mtime is not None else None
                 })
             
             # Sort: directories first, then files
             items.sort(key=lambda x: (0 if x['type'] == 'directory' else 1, x['name'].lower()))
             
-            # Calculate relative path
-            if browse_path.startswith(base_path):
-                relative_path = browse_path[len(base_path):].lstrip('/')
-            else:
+            # Calculate relative path; PurePosixPath ignores trailing slashes on base_path
+            try:
+                relative_path = str(PurePosixPath(browse_path).relative_to(base_path))
+            except ValueError:
+                relative_path = ''
+            if relative_path == '.':
                 relative_path = ''
             
             return {
@@ -282,23 +376,18 @@ class UploadService:
             return {'success': False, 'error': 'Path not found'}
         except Exception as e:
             return {'success': False, 'error': str(e)}
-        finally:
-            if sftp:
-                sftp.close()
-            if ssh:
-                ssh.close()
     
     def delete_file(self, server_id: int, file_path: str,
                    admin_username: str = "Admin",
                    ip_address: str = None) -> Dict[str, Any]:
         """Delete a file or folder on the server."""
         try:
-            server = self.server_repo.get_server_with_credentials(server_id)
+            server = self._get_server(server_id)
             if not server:
                 return {'success': False, 'error': 'Server not found'}
             
             base_path = server['base_path']
-            full_path = os.path.join(base_path, file_path)
+            full_path = self._join_path(server, base_path, file_path)
             
             if server['protocol'] == 'local':
                 result = self._delete_local(full_path, base_path)
@@ -306,7 +395,7 @@ class UploadService:
                 result = self._delete_sftp(server, full_path)
             
             if result['success']:
-                self.db.log_audit_event(
+                self._audit.submit(
                     admin_username,
                     'delete_file',
                     {
@@ -328,7 +417,7 @@ class UploadService:
         try:
             # Security check
             real_path = os.path.realpath(full_path)
-            real_base = os.path.realpath(base_path)
+            real_base = self._real_base(base_path)
             if not real_path.startswith(real_base) or real_path == real_base:
                 return {'success': False, 'error': 'Access denied'}
             
@@ -345,49 +434,101 @@ class UploadService:
     
     def _delete_sftp(self, server: Dict[str, Any], full_path: str) -> Dict[str, Any]:
         """Delete file/folder via SFTP."""
-        ssh = None
-        sftp = None
         try:
-            ssh = self._get_ssh_connection(server)
-            sftp = ssh.open_sftp()
-            
-            # Check if it's a directory
-            try:
-                attr = sftp.stat(full_path)
-                if S_ISDIR(attr.st_mode):
-                    # Recursively delete directory
-                    self._rmdir_recursive(sftp, full_path)
-                else:
+            with self._sftp_session(server) as sftp:
+                # Try it as a file first so plain files cost a single round trip
+                try:
                     sftp.remove(full_path)
-            except FileNotFoundError:
-                return {'success': False, 'error': 'File not found'}
+                except FileNotFoundError:
+                    return {'success': False, 'error': 'File not found'}
+                except IOError as remove_error:
+                    # remove fails on directories; the listing doubles as the type check
+                    try:
+                        attrs = sftp.listdir_attr(full_path)
+                    except IOError:
+                        raise remove_error
+                    self._rmdir_recursive(sftp, full_path, known_attrs=attrs)
             
             return {'success': True, 'message': 'Deleted successfully'}
             
         except Exception as e:
             return {'success': False, 'error': str(e)}
-        finally:
-            if sftp:
-                sftp.close()
-            if ssh:
-                ssh.close()
     
-    def _rmdir_recursive(self, sftp, path: str):
-        """Recursively delete a directory via SFTP."""
-        for attr in sftp.listdir_attr(path):
-            full_path = os.path.join(path, attr.filename)
-            if S_ISDIR(attr.st_mode):
-                self._rmdir_recursive(sftp, full_path)
-            else:
-                sftp.remove(full_path)
-        sftp.rmdir(path)
+    def _rmdir_recursive(self, sftp, path: str, *,
+                         known_attrs: Optional[List[paramiko.SFTPAttributes]] = None):
+        """
+        Recursively delete a directory, spreading SFTP calls over several channels.
+        
+        known_attrs is the caller's listing of path, if it already has one.
+        """
+        transport = sftp.get_channel().get_transport()
+        extra = []
+        try:
+            for _ in range(SFTP_PARALLEL_CHANNELS - 1):
+                extra.append(paramiko.SFTPClient.from_transport(transport))
+        except paramiko.SSHException as e:
+            # Server refused more channels (MaxSessions); use what we have
+            logger.debug(f"Opened {len(extra) + 1} SFTP channels for delete: {e}")
+        
+        channels = queue.SimpleQueue()
+        for channel in [sftp] + extra:
+            channels.put(channel)
+        
+        def run(op, target):
+            channel = channels.get()
+            try:
+                return getattr(channel, op)(target)
+            finally:
+                channels.put(channel)
+        
+        def run_all(pool, op, targets):
+            futures = {pool.submit(run, op, t): t for t in targets}
+            results, errors = {}, []
+            for future in as_completed(futures):
+                try:
+                    results[futures[future]] = future.result()
+                except Exception as e:
+                    errors.append(e)
+            if errors:
+                raise errors[0]
+            return results
+        
+        try:
+            with ThreadPoolExecutor(max_workers=len(extra) + 1) as pool:
+                # List one tree level at a time so every directory at a depth is fetched concurrently
+                levels = []
+                files = []
+                level = [path]
+                listing = {path: known_attrs} if known_attrs is not None else None
+                while level:
+                    levels.append(level)
+                    if listing is None:
+                        listing = run_all(pool, 'listdir_attr', level)
+                    next_level = []
+                    for dir_path, attrs in listing.items():
+                        for attr in attrs:
+                            child = str(PurePosixPath(dir_path, attr.filename))
+                            if S_ISDIR(attr.st_mode):
+                                next_level.append(child)
+                            else:
+                                files.append(child)
+                    level = next_level
+                    listing = None
+                
+                run_all(pool, 'remove', files)
+                # Leaves first, as the serial walk did
+                for level in reversed(levels):
+                    run_all(pool, 'rmdir', level)
+        finally:
+            for channel in extra:
+                channel.close()
     
     # ==================== Version Management ====================
     
     def get_versions(self, server_id: int) -> Dict[str, Any]:
         """Get version.json content from server."""
         try:
-            server = self.server_repo.get_server_with_credentials(server_id)
+            server = self._get_server(server_id)
             if not server:
                 return {'success': False, 'error': 'Server not found'}
             
@@ -423,34 +564,30 @@ class UploadService:
     def _get_sftp_versions(self, server: Dict[str, Any], 
                           version_path: str) -> Dict[str, Any]:
         """Get versions via SFTP."""
-        ssh = None
-        sftp = None
         try:
-            ssh = self._get_ssh_connection(server)
-            sftp = ssh.open_sftp()
-            
-            try:
-                with sftp.open(version_path, 'r') as f:
-                    versions = json.load(f)
-                return {'success': True, 'versions': versions}
-            except FileNotFoundError:
-                return {'success': True, 'versions': {'last_updated': None, 'images': {}}}
-            except json.JSONDecodeError:
-                return {'success': False, 'error': 'Invalid JSON in version file'}
-                
+            with self._sftp_session(server) as sftp:
+                return self._read_sftp_versions(sftp, version_path)
         except Exception as e:
             return {'success': False, 'error': str(e)}
-        finally:
-            if sftp:
-                sftp.close()
-            if ssh:
-                ssh.close()
+    
+    def _read_sftp_versions(self, sftp, version_path: str) -> Dict[str, Any]:
+        """Read version.json over an open SFTP session."""
+        try:
+            with sftp.open(version_path, 'r') as f:
+                # Request every block up front instead of one read per round trip
+                f.prefetch()
+                versions = json.load(f)
+            return {'success': True, 'versions': versions}
+        except FileNotFoundError:
+            return {'success': True, 'versions': {'last_updated': None, 'images': {}}}
+        except json.JSONDecodeError:
+            return {'success': False, 'error': 'Invalid JSON in version file'}
     
     def update_version(self, server_id: int, image_name: str, 
                       version: str, changelog: str = None) -> Dict[str, Any]:
         """Update version.json with new image version."""
         try:
-            server = self.server_repo.get_server_with_credentials(server_id)
+            server = self._get_server(server_id)
             if not server:
                 return {'success': False, 'error': 'Server not found'}
             
@@ -458,66 +595,100 @@ class UploadService:
             if not version_path:
                 return {'success': False, 'error': 'Version file path not configured'}
             
-            # Get current versions
-            result = self.get_versions(server_id)
-            if not result['success']:
-                return result
-            
-            versions = result['versions']
-            
-            # Update version info
-            versions['last_updated'] = datetime.utcnow().isoformat() + 'Z'
-            if 'images' not in versions:
-                versions['images'] = {}
-            
-            versions['images'][image_name] = {
-                'version': version,
-                'release_date': datetime.utcnow().strftime('%Y-%m-%d'),
-                'changelog': changelog or f'Updated to version {version}'
-            }
-            
-            # Save updated versions
             if server['protocol'] == 'local':
+                result = self._get_local_versions(version_path)
+                if not result['success']:
+                    return result
+                versions = result['versions']
+                if not self._apply_version(versions, image_name, version, changelog):
+                    return {'success': True, 'message': 'No change'}
                 return self._save_local_versions(version_path, versions)
-            else:
-                return self._save_sftp_versions(server, version_path, versions)
+            
+            # Read, modify and write back over a single SFTP session
+            with self._sftp_session(server) as sftp:
+                result = self._read_sftp_versions(sftp, version_path)
+                if not result['success']:
+                    return result
+                versions = result['versions']
+                if not self._apply_version(versions, image_name, version, changelog):
+                    return {'success': True, 'message': 'No change'}
+                return self._save_sftp_versions(sftp, version_path, versions)
                 
         except Exception as e:
             logger.error(f"Error updating version: {e}")
             return {'success': False, 'error': str(e)}
     
+    def _apply_version(self, versions: Dict[str, Any], image_name: str,
+                       version: str, changelog: str = None) -> bool:
+        """Record a new image version in a loaded version.json document.
+        
+        Returns False without touching the document when the image already
+        has this version and changelog, so re-uploads skip the write.
+        """
+        changelog = changelog or f'Updated to version {version}'
+        current = versions.get('images', {}).get(image_name)
+        if current and current.get('version') == version and current.get('changelog') == changelog:
+            return False
+        
+        versions['last_updated'] = datetime.utcnow().isoformat() + 'Z'
+        if 'images' not in versions:
+            versions['images'] = {}
+        
+        versions['images'][image_name] = {
+            'version': version,
+            'release_date': datetime.utcnow().strftime('%Y-%m-%d'),
+            'changelog': changelog
+        }
+        return True
+    
     def _save_local_versions(self, version_path: str, 
                             versions: Dict[str, Any]) -> Dict[str, Any]:
-        """Save versions to local file."""
+        """Save versions to local file, replacing it atomically."""
+        tmp_name = None
+        parent = os.path.dirname(version_path) or '.'
         try:
-            os.makedirs(os.path.dirname(version_path), exist_ok=True)
-            with open(version_path, 'w') as f:
-                json.dump(versions, f, indent=2)
+            if parent not in self._mkdir_cache:
+                os.makedirs(parent, exist_ok=True)
+                self._mkdir_cache.add(parent)
+            
+            try:
+                mode = os.stat(version_path).st_mode & 0o777
+            except FileNotFoundError:
+                mode = 0o644
+            
+            # Readers see either the old or the new file, never a partial write
+            with tempfile.NamedTemporaryFile('w', dir=parent, delete=False) as tf:
+                tmp_name = tf.name
+                tf.write(self._serialize_versions(versions))
+            os.chmod(tmp_name, mode)
+            os.replace(tmp_name, version_path)
+            tmp_name = None
             return {'success': True, 'message': 'Version updated'}
         except Exception as e:
+            # The directory may have been removed since it was cached
+            self._mkdir_cache.discard(parent)
             return {'success': False, 'error': str(e)}
+        finally:
+            if tmp_name and os.path.exists(tmp_name):
+                os.unlink(tmp_name)
     
-    def _save_sftp_versions(self, server: Dict[str, Any], version_path: str,
+    def _save_sftp_versions(self, sftp, version_path: str,
                            versions: Dict[str, Any]) -> Dict[str, Any]:
-        """Save versions via SFTP."""
-        ssh = None
-        sftp = None
+        """Save versions over an open SFTP session."""
         try:
-            ssh = self._get_ssh_connection(server)
-            sftp = ssh.open_sftp()
-            
             with sftp.open(version_path, 'w') as f:
-                json.dump(versions, f, indent=2)
+                f.write(self._serialize_versions(versions).encode())
             
             return {'success': True, 'message': 'Version updated'}
             
         except Exception as e:
             return {'success': False, 'error': str(e)}
-        finally:
-            if sftp:
-                sftp.close()
-            if ssh:
-                ssh.close()
+    
+    def _serialize_versions(self, versions: Dict[str, Any]) -> str:
+        """Render version.json in one dumps call (compact unless VERSION_FILE_PRETTY)."""
+        if VERSION_FILE_PRETTY:
+            return json.dumps(versions, indent=2)
+        return json.dumps(versions, separators=(',', ':'))
     
     def get_next_version(self, server_id: int, image_name: str) -> Dict[str, Any]:
         """Get the next version number for an image."""
@@ -553,13 +724,13 @@ class UploadService:
     
     # ==================== Upload Operations ====================
     
-    def upload_file(self, server_id: int, file_data: bytes, file_name: str,
-                   image_name: str, version: str, changelog: str = None,
+    def upload_file(self, server_id: int, file_stream: BinaryIO, file_name: str,
+                   file_size: int, image_name: str, version: str, changelog: str = None,
                    user_id: int = None, admin_username: str = "Admin",
                    ip_address: str = None) -> Dict[str, Any]:
-        """Upload a guest OS image file."""
+        """Upload a guest OS image file from a readable binary stream."""
         try:
-            server = self.server_repo.get_server_with_credentials(server_id)
+            server = self._get_server(server_id)
             if not server:
                 return {'success': False, 'error': 'Server not found'}
             
@@ -571,7 +742,7 @@ class UploadService:
             
             # Create upload record
             base_path = server['base_path']
-            dest_path = os.path.join(base_path, image_name, file_name)
+            dest_path = self._join_path(server, base_path, image_name, file_name)
             relative_path = os.path.join(image_name, file_name)
             
             upload_id = self.upload_repo.create_upload({
@@ -579,7 +750,7 @@ class UploadService:
                 'image_name': image_name,
                 'file_name': file_name,
                 'file_path': relative_path,
-                'file_size': len(file_data),
+                'file_size': file_size,
                 'file_type': file_ext,
                 'version': version,
                 'changelog': changelog,
@@ -593,18 +764,19 @@ class UploadService:
             # Perform upload
             try:
                 logger.info(f"Starting upload to {server['name']} ({server['protocol']}): {dest_path}")
+                # Each writer feeds the hasher chunk by chunk as it copies
+                hasher = hashlib.sha256()
                 if server['protocol'] == 'local':
-                    result = self._upload_local(dest_path, file_data)
+                    result = self._upload_local(dest_path, file_stream, file_size, hasher)
                 elif server['protocol'] == 'scp':
-                    result = self._upload_scp(server, dest_path, file_data)
+                    result = self._upload_scp(server, dest_path, file_stream, hasher)
                 elif server['protocol'] == 'sftp':
-                    result = self._upload_sftp(server, dest_path, file_data)
+                    result = self._upload_sftp(server, dest_path, file_stream, file_size, hasher)
                 else:
                     result = {'success': False, 'error': f"Unsupported protocol: {server['protocol']}"}
                 
                 if result['success']:
-                    # Calculate checksum
-                    checksum = hashlib.sha256(file_data).hexdigest()
+                    checksum = hasher.hexdigest()
                     self.upload_repo.update_upload_checksum(upload_id, checksum)
                     self.upload_repo.update_upload_status(upload_id, 'completed')
                     
@@ -612,7 +784,7 @@ class UploadService:
                     self.update_version(server_id, image_name, version, changelog)
                     
                     # Log audit
-                    self.db.log_audit_event(
+                    self._audit.submit(
                         admin_username,
                         'upload_guest_os',
                         {
@@ -620,7 +792,7 @@ class UploadService:
                             'server_id': server_id,
                             'image_name': image_name,
                             'version': version,
-                            'file_size': len(file_data)
+                            'file_size': file_size
                         },
                         ip_address
                     )
@@ -645,18 +817,31 @@ class UploadService:
             logger.error(f"Error uploading file: {e}")
             return {'success': False, 'error': str(e)}
     
-    def _upload_local(self, dest_path: str, file_data: bytes) -> Dict[str, Any]:
+    def _upload_local(self, dest_path: str, src: BinaryIO, total_size: int,
+                     hasher) -> Dict[str, Any]:
         """Upload file to local filesystem."""
         try:
             os.makedirs(os.path.dirname(dest_path), exist_ok=True)
             with open(dest_path, 'wb') as f:
-                f.write(file_data)
+                if total_size >= LOCAL_PREALLOCATE_THRESHOLD and hasattr(os, 'posix_fallocate'):
+                    # Reserve the extents once instead of growing the file per write
+                    fd = f.fileno()
+                    try:
+                        os.posix_fallocate(fd, 0, total_size)
+                        os.posix_fadvise(fd, 0, total_size, os.POSIX_FADV_SEQUENTIAL)
+                    except OSError as e:
+                        logger.debug(f"Preallocation skipped for {dest_path}: {e}")
+                while chunk := src.read(UPLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+                    hasher.update(chunk)
+                # Drop any reserved space the stream didn't fill
+                f.truncate()
             return {'success': True}
         except Exception as e:
             return {'success': False, 'error': str(e)}
     
     def _upload_scp(self, server: Dict[str, Any], dest_path: str,
-                   file_data: bytes) -> Dict[str, Any]:
+                   src: BinaryIO, hasher) -> Dict[str, Any]:
         """Upload file via native SCP command (much faster than SFTP)."""
         tmp_file = None
         try:
@@ -664,7 +849,11 @@ class UploadService:
             tmp_dir = os.path.expanduser('~/.cache/upload_tmp')
             os.makedirs(tmp_dir, exist_ok=True)
             tmp_file = tempfile.NamedTemporaryFile(delete=False, dir=tmp_dir)
-            tmp_file.write(file_data)
+            total_size = 0
+            while chunk := src.read(UPLOAD_CHUNK_SIZE):
+                tmp_file.write(chunk)
+                hasher.update(chunk)
+                total_size += len(chunk)
             tmp_file.close()
             
             host = server['ip_address']
@@ -673,7 +862,7 @@ class UploadService:
             password = server.get('password')
             
             # Create remote directory first via SSH
-            dir_path = os.path.dirname(dest_path)
+            dir_path = str(PurePosixPath(dest_path).parent)
             mkdir_cmd = ['ssh', '-o', 'StrictHostKeyChecking=no', '-p', str(port)]
             
             if password:
@@ -695,7 +884,7 @@ class UploadService:
             
             scp_cmd.extend([tmp_file.name, f'{username}@{host}:{dest_path}'])
             
-            logger.info(f"Running native SCP upload: {len(file_data) / (1024*1024):.1f} MB to {host}:{dest_path}")
+            logger.info(f"Running native SCP upload: {total_size / (1024*1024):.1f} MB to {host}:{dest_path}")
             
             result = subprocess.run(scp_cmd, capture_output=True, text=True, timeout=600)
             
@@ -721,36 +910,39 @@ class UploadService:
                 os.unlink(tmp_file.name)
 
     def _upload_sftp(self, server: Dict[str, Any], dest_path: str,
-                    file_data: bytes) -> Dict[str, Any]:
-        """Upload file via SFTP."""
-        ssh = None
-        sftp = None
+                    src: BinaryIO, total_size: int, hasher) -> Dict[str, Any]:
+        """Upload file via SFTP, streaming from src with pipelined writes."""
         try:
             logger.info(f"Connecting to {server['ip_address']}:{server.get('port', 22)}")
-            ssh = self._get_ssh_connection(server)
-            sftp = ssh.open_sftp()
-            logger.info(f"SFTP connection established")
-            
-            # Create directory if needed
-            dir_path = os.path.dirname(dest_path)
-            logger.info(f"Creating directory: {dir_path}")
-            self._mkdir_p(sftp, dir_path)
-            
-            # Upload file with progress logging
-            total_size = len(file_data)
-            logger.info(f"Uploading {total_size / (1024*1024):.1f} MB to {dest_path}")
-            
-            # Write in chunks for better performance and progress tracking
-            chunk_size = 1024 * 1024  # 1MB chunks
-            with sftp.open(dest_path, 'wb') as f:
-                written = 0
-                for i in range(0, total_size, chunk_size):
-                    chunk = file_data[i:i + chunk_size]
-                    f.write(chunk)
-                    written += len(chunk)
-                    if written % (10 * 1024 * 1024) == 0 or written == total_size:  # Log every 10MB
-                        progress = (written / total_size) * 100
-                        logger.info(f"Upload progress: {progress:.1f}% ({written / (1024*1024):.1f} MB / {total_size / (1024*1024):.1f} MB)")
+            if self._async_loop is not None:
+                logger.info(f"Uploading {total_size / (1024*1024):.1f} MB to {dest_path} via asyncssh")
+                self._run_async(server, self._upload_sftp_async(server, dest_path, src, hasher))
+                logger.info(f"Upload completed successfully")
+                return {'success': True}
+            
+            with self._sftp_session(server) as sftp:
+                logger.info(f"SFTP connection established")
+                
+                # Create directory if needed
+                dir_path = str(PurePosixPath(dest_path).parent)
+                logger.info(f"Creating directory: {dir_path}")
+                self._mkdir_p(sftp, dir_path)
+                
+                # Upload file with progress logging
+                logger.info(f"Uploading {total_size / (1024*1024):.1f} MB to {dest_path}")
+                
+                # Pipelined writes keep many SFTP packets in flight instead of
+                # waiting for an ack per packet; the checksum is taken in the same pass
+                with sftp.open(dest_path, 'wb') as f:
+                    f.set_pipelined(True)
+                    written = 0
+                    while chunk := src.read(UPLOAD_CHUNK_SIZE):
+                        f.write(chunk)
+                        hasher.update(chunk)
+                        written += len(chunk)
+                        if written % (10 * 1024 * 1024) == 0 or written == total_size:  # Log every 10MB
+                            progress = (written / total_size) * 100 if total_size else 100.0
+                            logger.info(f"Upload progress: {progress:.1f}% ({written / (1024*1024):.1f} MB / {total_size / (1024*1024):.1f} MB)")
             
             logger.info(f"Upload completed successfully")
             return {'success': True}
@@ -758,28 +950,51 @@ class UploadService:
         except Exception as e:
             logger.error(f"SFTP upload error: {e}")
             return {'success': False, 'error': str(e)}
-        finally:
-            if sftp:
-                sftp.close()
-            if ssh:
-                ssh.close()
+    
+    async def _listdir_sftp_async(self, server: Dict[str, Any], path: str) -> List[Tuple[str, int, int, int]]:
+        """List a remote directory with asyncssh as (name, mode, size, mtime) tuples."""
+        sftp = await self._async_sftp(server)
+        try:
+            names = await sftp.readdir(path)
+        except asyncssh.SFTPNoSuchFile as e:
+            raise FileNotFoundError(str(e)) from e
+        return [(n.filename, n.attrs.permissions, n.attrs.size, n.attrs.mtime)
+                for n in names if n.filename not in ('.', '..')]
+    
+    async def _upload_sftp_async(self, server: Dict[str, Any], dest_path: str,
+                                 src: BinaryIO, hasher):
+        """Stream src to dest_path with asyncssh, hashing each chunk as it is sent."""
+        sftp = await self._async_sftp(server)
+        await sftp.makedirs(str(PurePosixPath(dest_path).parent), exist_ok=True)
+        async with sftp.open(dest_path, 'wb') as f:
+            # Reads block, so keep them off the loop shared by every transfer
+            while chunk := await asyncio.to_thread(src.read, UPLOAD_CHUNK_SIZE):
+                hasher.update(chunk)
+                # asyncssh splits each write into parallel SFTP requests
+                await f.write(chunk)
     
     def _mkdir_p(self, sftp, remote_path: str):
-        """Create directory and parents via SFTP."""
-        dirs = []
-        while remote_path:
+        """Create directory and parents via SFTP, trying mkdir before any stat."""
+        missing = []
+        path = PurePosixPath(remote_path)
+        # name is empty once we reach '/' or '.'
+        while path.name:
             try:
-                sftp.stat(remote_path)
+                sftp.mkdir(str(path))
                 break
             except FileNotFoundError:
-                dirs.append(remote_path)
-                remote_path = os.path.dirname(remote_path)
+                # Parent is missing too; create it first
+                missing.append(path)
+                path = path.parent
+            except IOError:
+                # SFTPv3 has no EEXIST status, so an existing path comes back
+                # as a generic failure; only then pay for a stat
+                if not S_ISDIR(sftp.stat(str(path)).st_mode):
+                    raise
+                break
         
-        for d in reversed(dirs):
-            try:
-                sftp.mkdir(d)
-            except:
-                pass
+        for d in reversed(missing):
+            sftp.mkdir(str(d))
     
     def get_upload_history(self, server_id: int, limit: int = 50) -> Dict[str, Any]:
         """Get upload history for a server."""
@@ -790,31 +1005,260 @@ class UploadService:
             logger.error(f"Error fetching upload history: {e}")
             return {'success': False, 'error': str(e)}
     
+    def verify_upload(self, server_id: int, upload_id: int) -> Dict[str, Any]:
+        """Re-hash a stored image and compare it with the recorded checksum."""
+        try:
+            upload = self.upload_repo.get_upload_by_id(upload_id)
+            if not upload or upload['server_id'] != server_id:
+                return {'success': False, 'error': 'Upload not found'}
+            if not upload.get('checksum'):
+                return {'success': False, 'error': 'Upload has no recorded checksum'}
+            
+            server = self._get_server(server_id)
+            if not server:
+                return {'success': False, 'error': 'Server not found'}
+            
+            full_path = self._join_path(server, server['base_path'], upload['file_path'])
+            if server['protocol'] == 'local':
+                # file_digest hashes in C with the GIL released
+                with open(full_path, 'rb') as f:
+                    checksum = hashlib.file_digest(f, 'sha256').hexdigest()
+            else:
+                hasher = hashlib.sha256()
+                with self._sftp_session(server) as sftp:
+                    with sftp.open(full_path, 'rb') as f:
+                        f.prefetch(max_concurrent_requests=SFTP_PREFETCH_REQUESTS)
+                        while chunk := f.read(UPLOAD_CHUNK_SIZE):
+                            hasher.update(chunk)
+                checksum = hasher.hexdigest()
+            
+            return {
+                'success': True,
+                'verified': checksum == upload['checksum'],
+                'checksum': checksum,
+                'expected_checksum': upload['checksum']
+            }
+            
+        except FileNotFoundError:
+            return {'success': False, 'error': 'File not found'}
+        except Exception as e:
+            logger.error(f"Error verifying upload: {e}")
+            return {'success': False, 'error': str(e)}
+    
     # ==================== Helper Methods ====================
     
-    def _get_ssh_connection(self, server: Dict[str, Any]) -> paramiko.SSHClient:
-        """Get SSH connection to server."""
-        ssh = paramiko.SSHClient()
-        ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+    def _get_server(self, server_id: int) -> Optional[Dict[str, Any]]:
+        """Get a server with credentials, served from a short TTL cache."""
+        with self._server_cache_lock:
+            server = self._server_cache.get(server_id)
+        if server is None:
+            server = self.server_repo.get_server_with_credentials(server_id)
+            # Misses and DB errors come back as None and are not cached
+            if server:
+                with self._server_cache_lock:
+                    self._server_cache[server_id] = server
+        return server
+    
+    def _invalidate_server(self, server_id: int):
+        """Forget cached state for a server after it is updated or deleted."""
+        with self._server_cache_lock:
+            self._server_cache.pop(server_id, None)
+        self._pkey_cache.pop(server_id, None)
+        # Keyed by path, not server, and tiny; just start over
+        self._realpath_cache.clear()
+        self._close_pooled(server_id)
+        if self._async_loop is not None:
+            self._async_loop.call_soon_threadsafe(self._drop_async_client, server_id)
+    
+    def _real_base(self, base_path: str) -> str:
+        """Resolve a server base path once instead of on every access check."""
+        real_base = self._realpath_cache.get(base_path)
+        if real_base is None:
+            real_base = os.path.realpath(base_path)
+            self._realpath_cache[base_path] = real_base
+        return real_base
+    
+    def _join_path(self, server: Dict[str, Any], *parts: str) -> str:
+        """Join path parts; remote servers always use POSIX separators."""
+        if server['protocol'] == 'local':
+            return os.path.join(*parts)
+        return str(PurePosixPath(*parts))
+    
+    @contextmanager
+    def _sftp_session(self, server: Dict[str, Any]) -> Iterator[paramiko.SFTPClient]:
+        """Borrow a pooled SFTP session for a server, connecting if none is idle."""
+        server_id = server['id']
+        ssh, sftp = self._checkout_session(server_id)
+        if sftp is None:
+            ssh = self._get_ssh_connection(server)
+            try:
+                sftp = ssh.open_sftp()
+            except Exception:
+                ssh.close()
+                raise
         
-        connect_kwargs = {
-            'hostname': server['ip_address'],
+        try:
+            yield sftp
+        except BaseException:
+            # The channel may be half-written or closed while the transport lives on;
+            # never hand such a session to the next caller
+            ssh.close()
+            raise
+        self._return_session(server_id, ssh, sftp)
+    
+    def _checkout_session(self, server_id: int) -> Tuple[Optional[paramiko.SSHClient], Optional[paramiko.SFTPClient]]:
+        """Pop the most recently used live session for a server, if any."""
+        stale = []
+        found = (None, None)
+        now = time.monotonic()
+        with self._pool_lock:
+            idle = self._pool.get(server_id, [])
+            while idle:
+                last_used, ssh, sftp = idle.pop()
+                if now - last_used < SFTP_POOL_IDLE_TTL and self._session_alive(ssh, sftp):
+                    found = (ssh, sftp)
+                    break
+                stale.append(ssh)
+        
+        for ssh in stale:
+            ssh.close()
+        return found
+    
+    def _return_session(self, server_id: int, ssh: paramiko.SSHClient,
+                        sftp: paramiko.SFTPClient):
+        """Put a session back in the pool, or close it if it is dead or surplus."""
+        if self._session_alive(ssh, sftp):
+            with self._pool_lock:
+                idle = self._pool.setdefault(server_id, [])
+                if len(idle) < SFTP_POOL_MAX_IDLE:
+                    idle.append((time.monotonic(), ssh, sftp))
+                    return
+        ssh.close()
+    
+    @staticmethod
+    def _session_alive(ssh: paramiko.SSHClient, sftp: paramiko.SFTPClient) -> bool:
+        """Both the SSH transport and the SFTP channel must still be open."""
+        transport = ssh.get_transport()
+        channel = sftp.get_channel()
+        return bool(transport and transport.is_active() and channel is not None and not channel.closed)
+    
+    def _close_pooled(self, server_id: int):
+        """Drop all idle sessions for a server, e.g. after its settings change."""
+        with self._pool_lock:
+            idle = self._pool.pop(server_id, [])
+        for _, ssh, _ in idle:
+            ssh.close()
+    
+    def _run_async(self, server: Dict[str, Any], coro):
+        """Run an asyncssh coroutine on the upload event loop and wait for it."""
+        try:
+            return asyncio.run_coroutine_threadsafe(coro, self._async_loop).result()
+        except BaseException as e:
+            # The client is shared by concurrent transfers: keep it after a per-file
+            # SFTP status error, but drop it when the channel or connection may be broken
+            lost = (asyncssh.SFTPConnectionLost, asyncssh.SFTPNoConnection)
+            if isinstance(e, lost) or not isinstance(e, (FileNotFoundError, asyncssh.SFTPError)):
+                self._async_loop.call_soon_threadsafe(self._drop_async_client, server['id'])
+            raise
+    
+    async def _async_sftp(self, server: Dict[str, Any]):
+        """Return the cached asyncssh SFTP client for a server, connecting if needed."""
+        server_id = server['id']
+        cached = self._async_clients.get(server_id)
+        if cached is not None:
+            last_used, conn, sftp = cached
+            if time.monotonic() - last_used < SFTP_POOL_IDLE_TTL and not conn.is_closed():
+                self._async_clients[server_id] = (time.monotonic(), conn, sftp)
+                return sftp
+            self._drop_async_client(server_id)
+        
+        conn = await asyncssh.connect(server['ip_address'], **self._asyncssh_kwargs(server))
+        try:
+            sftp = await conn.start_sftp_client()
+        except BaseException:
+            conn.close()
+            raise
+        
+        # Another transfer may have connected while this one was waiting
+        cached = self._async_clients.get(server_id)
+        if cached is not None and not cached[1].is_closed():
+            conn.close()
+            return cached[2]
+        self._async_clients[server_id] = (time.monotonic(), conn, sftp)
+        return sftp
+    
+    def _drop_async_client(self, server_id: int):
+        """Close a server's cached asyncssh connection; runs on the upload event loop."""
+        cached = self._async_clients.pop(server_id, None)
+        if cached is not None:
+            cached[1].close()
+    
+    def _asyncssh_kwargs(self, server: Dict[str, Any]) -> Dict[str, Any]:
+        """Connection options for asyncssh, mirroring _get_ssh_connection."""
+        # Host keys are accepted without verification, as with AutoAddPolicy
+        kwargs = {
             'port': server.get('port', 22),
             'username': server.get('username'),
-            'timeout': 30
+            'known_hosts': None,
+            'connect_timeout': 30
         }
-        
         if server.get('ssh_key'):
-            key_file = tempfile.NamedTemporaryFile(mode='w', delete=False)
-            key_file.write(server['ssh_key'])
-            key_file.close()
-            connect_kwargs['key_filename'] = key_file.name
-            ssh.connect(**connect_kwargs)
-            os.unlink(key_file.name)
+            kwargs['client_keys'] = [asyncssh.import_private_key(server['ssh_key'])]
         elif server.get('password'):
-            connect_kwargs['password'] = server['password']
-            ssh.connect(**connect_kwargs)
+            kwargs['password'] = server['password']
+        return kwargs
+    
+    def _load_pkey(self, server: Dict[str, Any]) -> paramiko.PKey:
+        """Parse a server's private key once and keep it in memory."""
+        pkey = self._pkey_cache.get(server['id'])
+        if pkey is not None:
+            return pkey
+        
+        for key_class in (paramiko.Ed25519Key, paramiko.ECDSAKey, paramiko.RSAKey):
+            try:
+                pkey = key_class.from_private_key(io.StringIO(server['ssh_key']))
+                break
+            except paramiko.SSHException:
+                continue
         else:
+            raise paramiko.SSHException('Unsupported or invalid SSH private key')
+        
+        self._pkey_cache[server['id']] = pkey
+        return pkey
+    
+    def _get_ssh_connection(self, server: Dict[str, Any]) -> paramiko.SSHClient:
+        """Get SSH connection to server."""
+        ssh = paramiko.SSHClient()
+        ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        
+        host = server['ip_address']
+        port = server.get('port', 22)
+        
+        sock = socket.create_connection((host, port), timeout=30)
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SSH_SOCKET_BUFFER_SIZE)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SSH_SOCKET_BUFFER_SIZE)
+            
+            connect_kwargs = {
+                'hostname': host,
+                'port': port,
+                'username': server.get('username'),
+                'timeout': 30,
+                'sock': sock
+            }
+            
+            if server.get('ssh_key'):
+                connect_kwargs['pkey'] = self._load_pkey(server)
+            elif server.get('password'):
+                connect_kwargs['password'] = server['password']
             ssh.connect(**connect_kwargs)
+        except Exception:
+            # We own the socket (passed as sock=), so paramiko won't close it on failure
+            ssh.close()
+            sock.close()
+            raise
         
+        # Channels opened after this (e.g. open_sftp) get the larger window
+        ssh.get_transport().set_default_window_size(SSH_WINDOW_SIZE)
         return ssh
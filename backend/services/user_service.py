@@ -4,7 +4,7 @@ import requests
 import os
 import secrets
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional
 from loguru import logger
 
 from database import UserDatabase
@@ -12,6 +12,59 @@ from database.password_reset_repository import PasswordResetRepository
 from utils.helpers import hash_password, get_client_ip
 from utils.validators import is_valid_email, is_valid_username
 from services.nginx_service import NginxService
+from services.audit_service import AuditEventWriter
+from models.user import AdminUserRow
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Shared read-only defaults. Kept as plain dicts (not MappingProxyType) because
+# they end up in JSON responses and metadata; never mutate them in place.
+DEFAULT_USER_RESOURCES = {'cpu': '4 cores', 'ram': '8GB', 'gpu': '1 core, 12GB'}
+DEFAULT_ADMIN_RESOURCES = {'cpu': '8 cores', 'ram': '16GB', 'gpu': '2 cores, 24GB'}
+NO_CONTAINER_RESOURCES = {'cpu': 'N/A', 'ram': 'N/A', 'gpu': 'N/A'}
+PENDING_RESOURCES = {'cpu': 'NA', 'ram': 'NA', 'gpu': 'NA'}
+
+SERVER_LOCATIONS = {
+    'Server 1': 'us-east-1',
+    'Server 2': 'us-west-2',
+    'Server 3': 'eu-west-1',
+    'Server 4': 'ap-south-1'
+}
+# Legacy listing fallback: users without an assignment map to 'Server {id % 4 + 1}'
+FALLBACK_SERVERS = tuple(SERVER_LOCATIONS)
+
+# Admin listing: (is_approved, is_new_registration) -> (role, status, fallback container status).
+# user_type 'admin'/'qvp' override the role via TYPE_ROLES.
+ROLE_STATUS = {
+    (True, True): ('Developer', 'Running', 'running'),
+    (True, False): ('Developer', 'Running', 'running'),
+    (False, True): ('Pending', 'Pending', 'stopped'),
+    (False, False): ('Pending', 'Stopped', 'stopped'),
+}
+TYPE_ROLES = {'admin': 'Admin', 'qvp': 'QVP'}
+
+
+def _now_iso() -> str:
+    """Current local time as an ISO-8601 string, to the second."""
+    return datetime.now().isoformat(timespec='seconds')
+
+
+def _json_loads(raw):
+    """Parse JSON with orjson when available (accepts str or bytes)."""
+    if orjson is None:
+        return json.loads(raw)
+    return orjson.loads(raw)
+
+
+def _json_dumps(value) -> str:
+    """Serialize to a JSON string with orjson when available."""
+    if orjson is None:
+        return json.dumps(value)
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
 
 class UserService:
     
@@ -21,18 +74,22 @@ class UserService:
         self.nginx_service = NginxService(nginx_config_file)
         self.agent_port = agent_port
         self.password_reset_repo = PasswordResetRepository()
+        # Audit rows are batched on a background thread instead of one insert per action
+        self._audit = AuditEventWriter(db)
     
     def _parse_user_metadata(self, metadata_raw: Optional[str]) -> Dict[str, Any]:
         if not metadata_raw:
             return {}
             
         try:
-            metadata = json.loads(metadata_raw)
+            metadata = _json_loads(metadata_raw)
+            # Legacy rows were stored double-encoded; the startup migration
+            # unwraps them, so this second parse should no longer fire
             if isinstance(metadata, str):
-                metadata = json.loads(metadata)
+                metadata = _json_loads(metadata)
             return metadata if isinstance(metadata, dict) else {}
-        except (json.JSONDecodeError, TypeError) as e:
-            logger.warning(f"Error parsing metadata: {e}")
+        except (ValueError, TypeError) as e:
+            logger.warning("Error parsing metadata: {}", e)
             return {}
     
     def _get_server_ip_from_assignment(self, server_assignment: str) -> Optional[str]:
@@ -45,7 +102,7 @@ class UserService:
                 return ip
             return None
         except Exception as e:
-            logger.warning(f"Error parsing server assignment: {e}")
+            logger.warning("Error parsing server assignment: {}", e)
             return None
     
     def get_all_users(self) -> List[Dict[str, Any]]:
@@ -81,22 +138,23 @@ class UserService:
                 return result
             
             username = user['username']
-            logger.info(user)
+            logger.info("Deleting user: {}", user)
 
             # Parse user metadata
             metadata = self._parse_user_metadata(user.get('metadata'))
-            logger.info(f"Parsed metadata for user {username}: {metadata}")
+            logger.info("Parsed metadata for user {}: {}", username, metadata)
             
             container_info = None
             if metadata.get('container') and not metadata['container'].get('creation_failed'):
                 container_info = metadata['container']
-                logger.info(f"Found container for user {username}: {container_info}")
+                logger.info("Found container for user {}: {}", username, container_info)
             
             if container_info and container_info.get('name'):
                 container_deletion_result = self._delete_user_container(
                     container_info, 
                     user_id, 
-                    metadata.get('server_assignment')
+                    metadata.get('server_assignment'),
+                    username=username
                 )
                 result['container_deleted'] = container_deletion_result.get('success', False)
                 result['container_details'] = container_deletion_result
@@ -135,27 +193,28 @@ class UserService:
                 result['success'] = True
                 
                 # Log audit event
-                audit_details = {
-                    'message': f'User {username} (ID: {user_id}) deleted by {admin_username}',
-                    'deleted_user': username,
-                    'container_deleted': result['container_deleted'],
-                    'nginx_routes_deleted': result['nginx_routes_deleted'],
-                    'workspace_deleted': result['workspace_deleted'],
-                    'workspace_path': result['workspace_path']
-                }
-                if container_info:
-                    audit_details['container_name'] = container_info.get('name')
-                    audit_details['container_deletion_details'] = result['container_details']
+                if self._audit.enabled:
+                    audit_details = {
+                        'message': f'User {username} (ID: {user_id}) deleted by {admin_username}',
+                        'deleted_user': username,
+                        'container_deleted': result['container_deleted'],
+                        'nginx_routes_deleted': result['nginx_routes_deleted'],
+                        'workspace_deleted': result['workspace_deleted'],
+                        'workspace_path': result['workspace_path']
+                    }
+                    if container_info:
+                        audit_details['container_name'] = container_info.get('name')
+                        audit_details['container_deletion_details'] = result['container_details']
                 
-                # Add nginx deletion details to audit log
-                audit_details['nginx_deletion_details'] = result['nginx_deletion_details']
+                    # Add nginx deletion details to audit log
+                    audit_details['nginx_deletion_details'] = result['nginx_deletion_details']
                 
-                self.db.log_audit_event(
-                    admin_username,
-                    'delete_user',
-                    audit_details,
-                    metadata.get('server_assignment')
-                )
+                    self._audit.submit(
+                        admin_username,
+                        'delete_user',
+                        audit_details,
+                        metadata.get('server_assignment')
+                    )
                 
                 # Create comprehensive success message
                 success_parts = [f'User {username}']
@@ -209,21 +268,19 @@ class UserService:
             if not user:
                 return {'success': False, 'error': 'User not found'}
             
+            now_iso = _now_iso()
+
             # Parse existing metadata
             metadata = self._parse_user_metadata(user.get('metadata'))
             
             # Use provided resources or defaults
-            user_resources = resources or metadata.get('resources', {
-                'cpu': '4 cores',
-                'ram': '8GB', 
-                'gpu': '1 core, 12GB'
-            })
+            user_resources = resources or metadata.get('resources', DEFAULT_USER_RESOURCES)
             
             # Update metadata with server assignment and approval info
             metadata.update({
                 'server_assignment': server_assignment,
                 'approved_by': admin_username,
-                'approved_at': datetime.now().isoformat(),
+                'approved_at': now_iso,
                 'resources': user_resources
             })
             
@@ -241,7 +298,7 @@ class UserService:
                     'name': container_info.get('name'),
                     'id': container_info.get('id'),
                     'status': container_info.get('status'),
-                    'created_at': datetime.now().isoformat()
+                    'created_at': now_iso
                 }
                 logger.info(f"Container {container_info.get('name')} assigned to user {user['username']}")
                 redirect_url=f"http://{redirect_server}:{self.agent_port}"
@@ -269,7 +326,7 @@ class UserService:
                         'jupyter_server': jupyter_server,
                         'vscode_port': vscode_port,
                         'jupyter_port': jupyter_port,
-                        'configured_at': datetime.now().isoformat(),
+                        'configured_at': now_iso,
                         'result': nginx_result
                     }
                 else:
@@ -286,7 +343,7 @@ class UserService:
                         'configured': nginx_result.get('success', False),
                         'vscode_server': server_addresses['vscode_server'],
                         'jupyter_server': server_addresses['jupyter_server'],
-                        'configured_at': datetime.now().isoformat(),
+                        'configured_at': now_iso,
                         'result': nginx_result
                     }
                 
@@ -298,39 +355,36 @@ class UserService:
                 metadata['container'] = {
                     'creation_failed': True,
                     'error': container_result.get('error', 'Unknown error'),
-                    'attempted_at': datetime.now().isoformat()
+                    'attempted_at': now_iso
                 }
                 logger.warning(f"Container creation failed for user {user['username']}: {container_result.get('error')}")
 
             # Update user approval status
-            self.db.update_user(user_id, {
-                'is_approved': is_approved,
-                'redirect_url': redirect_url,
-                'metadata': json.dumps(metadata)
-            })
+            self.db.update_user_approval(user_id, is_approved, redirect_url, _json_dumps(metadata))
 
             # Prepare audit details
-            audit_details = {
-                'message': f'User {user["username"]} (ID: {user_id}) approved by {admin_username}',
-                'approved_user': user['username'],
-                'server_assignment': server_assignment,
-                'redirect_server': redirect_server,
-                'redirect_url': redirect_url,
-                'container_created': container_result.get('success', False),
-                'container_info': container_result.get('container', {})
-            }
+            if self._audit.enabled:
+                audit_details = {
+                    'message': f'User {user["username"]} (ID: {user_id}) approved by {admin_username}',
+                    'approved_user': user['username'],
+                    'server_assignment': server_assignment,
+                    'redirect_server': redirect_server,
+                    'redirect_url': redirect_url,
+                    'container_created': container_result.get('success', False),
+                    'container_info': container_result.get('container', {})
+                }
             
-            # Add nginx routing information to audit log
-            if nginx_result:
-                audit_details['nginx_routes_configured'] = nginx_result.get('success', False)
-                audit_details['nginx_result'] = nginx_result
+                # Add nginx routing information to audit log
+                if nginx_result:
+                    audit_details['nginx_routes_configured'] = nginx_result.get('success', False)
+                    audit_details['nginx_result'] = nginx_result
             
-            self.db.log_audit_event(
-                admin_username,
-                'approve_user',
-                audit_details,
-                ip_address
-            )
+                self._audit.submit(
+                    admin_username,
+                    'approve_user',
+                    audit_details,
+                    ip_address
+                )
             
             if container_result.get('success'):
                 return {
@@ -375,7 +429,7 @@ class UserService:
             if response.status_code == 200:
                 result = response.json()
                 if result.get('success'):
-                    logger.success(f"Container created successfully for user {username}: {result.get('container', {})}")
+                    logger.success("Container created successfully for user {}: {}", username, result.get('container', {}))
                     return {
                         'success': True,
                         'container': result.get('container', {}),
@@ -442,147 +496,153 @@ class UserService:
         except:
             return "4g"
     
-    def get_admin_users(self) -> List[Dict[str, Any]]:
+    def get_admin_users(self, limit: Optional[int] = None, after_id: int = 0) -> List[AdminUserRow]:
+        """Admin user listing; all users when limit is None, otherwise one page after after_id."""
         try:
-            users = self.db.get_all_users()
-            
-            admin_users = []
-            for user in users:
-                # Skip system user
-                if user.get('username') == 'System' or user.get('status') == 'system':
-                    continue
-                
-                # Parse metadata if available
-                metadata = self._parse_user_metadata(user.get('metadata'))
-                
-                # Determine if user came through registration or was created by admin
-                is_new_registration = not metadata.get('created_by_admin', False)
-                
-                # Check if user needs container (QVP and Admin users don't)
-                user_type = user.get('user_type')
-                no_container_needed = metadata.get('no_container', False) or user_type in ('admin', 'qvp')
-                
-                # Set container, resources, and server based on user status
-                if no_container_needed:
-                    # Admin/QVP users - no container assignment
-                    container_name = 'N/A'
-                    container_status = 'N/A'
-                    resources = {'cpu': 'N/A', 'ram': 'N/A', 'gpu': 'N/A'}
-                    server_assignment = 'N/A'
-                    server_location = 'N/A'
-                elif is_new_registration and not user.get('is_approved'):
-                    # New registration - show NA until approved
-                    container_name = 'NA'
-                    container_status = 'pending'
-                    resources = {'cpu': 'NA', 'ram': 'NA', 'gpu': 'NA'}
-                    server_assignment = 'NA'
-                    server_location = 'NA'
-                else:
-                    # Approved user or admin-created user
-                    # Use actual container name from metadata if available
-                    if metadata.get('container') and metadata['container'].get('name'):
-                        container_name = metadata['container']['name']
-                        container_status = metadata['container'].get('status', 'unknown')
-                        # Update status based on current approval status if container creation failed
-                        if metadata['container'].get('creation_failed'):
-                            container_status = 'failed'
-                    else:
-                        # Fallback to generic name for backward compatibility
-                        container_name = f"container-{user['username'][:2].lower()}-{user['id']:03d}"
-                        container_status = 'running' if user.get('is_approved') else 'stopped'
-                    
-                    # Get resources from metadata or use defaults
-                    if metadata.get('resources'):
-                        resources = metadata['resources']
-                    else:
-                        if user.get('is_admin'):
-                            resources = {'cpu': '8 cores', 'ram': '16GB', 'gpu': '2 cores, 24GB'}
-                        else:
-                            resources = {'cpu': '4 cores', 'ram': '8GB', 'gpu': '1 core, 12GB'}
-                    
-                    # Get server assignment from metadata or use fallback
-                    server_assignment = metadata.get('server_assignment', 'NA')
-                    if server_assignment == 'NA' or not server_assignment:
-                        # Fallback to old logic for backward compatibility
-                        server_num = (user['id'] % 4) + 1
-                        server_assignment = f'Server {server_num}'
-                    
-                    # Get server location
-                    server_locations = {
-                        'Server 1': 'us-east-1',
-                        'Server 2': 'us-west-2', 
-                        'Server 3': 'eu-west-1',
-                        'Server 4': 'ap-south-1'
-                    }
-                    
-                    # Handle IP-based server assignments
-                    if server_assignment.startswith(('127.', '192.', '10.', 'server-')):
-                        server_location = 'localhost' if server_assignment.startswith('127.') else 'unknown'
-                    else:
-                        server_location = server_locations.get(server_assignment, 'unknown')
-                    
-                # Determine role based on user_type (with backward compatibility)
-                user_type = user.get('user_type')
-                if user_type == 'admin' or (not user_type and user.get('is_admin')):
-                    role = 'Admin'
-                elif user_type == 'qvp':
-                    role = 'QVP'
-                elif user.get('is_approved'):
-                    role = 'Developer'
-                else:
-                    role = 'Pending'
-                
-                # Build service URLs for approved users with containers
-                service_urls = {
-                    'vscode': None,
-                    'jupyter': None
-                }
-                
-                if user.get('is_approved') and not no_container_needed:
-                    mgmt_server = os.getenv('MGMT_SERVER_IP', 'localhost')
-                    username = user['username']
-                    
-                    # Check if nginx routes are configured
-                    nginx_routes = metadata.get('nginx_routes', {})
-                    if nginx_routes.get('configured'):
-                        # Use nginx proxy URLs
-                        service_urls['vscode'] = f"http://{mgmt_server}/user/{username}/vscode/"
-                        service_urls['jupyter'] = f"http://{mgmt_server}/user/{username}/jupyter/"
-                    elif nginx_routes.get('vscode_server') and nginx_routes.get('jupyter_server'):
-                        # Use direct server URLs
-                        service_urls['vscode'] = f"http://{nginx_routes['vscode_server']}/"
-                        service_urls['jupyter'] = f"http://{nginx_routes['jupyter_server']}/"
-                
-                admin_user = {
-                    'id': str(user['id']),
-                    'name': user['username'],
-                    'email': user['email'],
-                    'role': role,
-                    'container': container_name,
-                    'containerStatus': container_status,
-                    'resources': resources,
-                    'server': server_assignment,
-                    'serverLocation': server_location,
-                    'status': 'Running' if user.get('is_approved') else ('Pending' if is_new_registration else 'Stopped'),
-                    'isNewRegistration': is_new_registration,
-                    'serviceUrls': service_urls
-                }
-                admin_users.append(admin_user)
-            
-            return admin_users
+            if limit is None:
+                return list(self.iter_admin_users(after_id=after_id))
+            users = self.db.get_admin_listing_users(limit, after_id)
+            return self._build_admin_page(users, os.getenv('MGMT_SERVER_IP', 'localhost'))
         except Exception as e:
             logger.error(f"Error fetching admin users: {e}")
             return []
+
+    def iter_admin_users(self, page_size: int = 100, after_id: int = 0) -> Iterator[AdminUserRow]:
+        """Yield admin listing entries, reading users from the database one page at a time."""
+        mgmt_server = os.getenv('MGMT_SERVER_IP', 'localhost')
+        # System user is filtered out in SQL
+        for users in self.db.iter_user_pages(page_size, after_id):
+            yield from self._build_admin_page(users, mgmt_server)
+
+    def _parse_metadata_page(self, users: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Parse a page of metadata columns with one JSON decode of the joined array."""
+        raws = [user.get('metadata') for user in users]
+        try:
+            parts = [
+                raw.decode() if isinstance(raw, (bytes, bytearray)) else (raw or 'null')
+                for raw in raws
+            ]
+            parsed = _json_loads('[' + ','.join(parts) + ']')
+        except (ValueError, TypeError):
+            parsed = None
+        if not isinstance(parsed, list) or len(parsed) != len(raws):
+            # A malformed value breaks the joined array; parse row by row instead
+            return [self._parse_user_metadata(raw) for raw in raws]
+        return [
+            metadata if isinstance(metadata, dict)
+            else (self._parse_user_metadata(raw) if isinstance(metadata, str) else {})
+            for metadata, raw in zip(parsed, raws)
+        ]
+
+    def _build_admin_page(self, users: List[Dict[str, Any]], mgmt_server: str) -> List[AdminUserRow]:
+        metadata_page = self._parse_metadata_page(users)
+        return [self._build_admin_user(user, metadata, mgmt_server)
+                for user, metadata in zip(users, metadata_page)]
+
+    def _build_admin_user(self, user: Dict[str, Any], metadata: Dict[str, Any],
+                          mgmt_server: str) -> AdminUserRow:
+        """Shape a user row and its parsed metadata into the admin listing entry."""
+        # Determine if user came through registration or was created by admin
+        is_new_registration = not metadata.get('created_by_admin', False)
+        
+        is_approved = bool(user.get('is_approved'))
+        role, status, fallback_container_status = ROLE_STATUS[(is_approved, is_new_registration)]
+        
+        # Role from user_type; legacy rows without one fall back to is_admin
+        user_type = user.get('user_type')
+        role = TYPE_ROLES.get(user_type or ('admin' if user.get('is_admin') else None), role)
+        
+        # Check if user needs container (QVP and Admin users don't)
+        no_container_needed = metadata.get('no_container', False) or user_type in ('admin', 'qvp')
+        
+        # Set container, resources, and server based on user status
+        if no_container_needed:
+            # Admin/QVP users - no container assignment
+            container_name = 'N/A'
+            container_status = 'N/A'
+            resources = NO_CONTAINER_RESOURCES
+            server_assignment = 'N/A'
+            server_location = 'N/A'
+        elif is_new_registration and not is_approved:
+            # New registration - show NA until approved
+            container_name = 'NA'
+            container_status = 'pending'
+            resources = PENDING_RESOURCES
+            server_assignment = 'NA'
+            server_location = 'NA'
+        else:
+            # Approved user or admin-created user
+            # Use actual container name from metadata if available
+            if metadata.get('container') and metadata['container'].get('name'):
+                container_name = metadata['container']['name']
+                container_status = metadata['container'].get('status', 'unknown')
+                # Update status based on current approval status if container creation failed
+                if metadata['container'].get('creation_failed'):
+                    container_status = 'failed'
+            else:
+                # Fallback to generic name for backward compatibility
+                container_name = user['container_name']
+                container_status = fallback_container_status
+            
+            # Get resources from metadata or use defaults
+            if metadata.get('resources'):
+                resources = metadata['resources']
+            else:
+                resources = DEFAULT_ADMIN_RESOURCES if user.get('is_admin') else DEFAULT_USER_RESOURCES
+            
+            # Get server assignment from metadata or use fallback
+            server_assignment = metadata.get('server_assignment', 'NA')
+            if server_assignment == 'NA' or not server_assignment:
+                # Fallback to old logic for backward compatibility
+                server_assignment = FALLBACK_SERVERS[user['id'] % 4]
+            
+            # Named servers resolve by dict lookup; IP-based assignments are
+            # 'localhost' for loopback and 'unknown' otherwise
+            server_location = SERVER_LOCATIONS.get(server_assignment)
+            if server_location is None:
+                server_location = 'localhost' if server_assignment.startswith('127.') else 'unknown'
+            
+        # Build service URLs for approved users with containers
+        service_urls = {
+            'vscode': None,
+            'jupyter': None
+        }
+        
+        if is_approved and not no_container_needed:
+            username = user['username']
+            
+            # Check if nginx routes are configured
+            nginx_routes = metadata.get('nginx_routes', {})
+            if nginx_routes.get('configured'):
+                # Use nginx proxy URLs
+                service_urls['vscode'] = f"http://{mgmt_server}/user/{username}/vscode/"
+                service_urls['jupyter'] = f"http://{mgmt_server}/user/{username}/jupyter/"
+            elif nginx_routes.get('vscode_server') and nginx_routes.get('jupyter_server'):
+                # Use direct server URLs
+                service_urls['vscode'] = f"http://{nginx_routes['vscode_server']}/"
+                service_urls['jupyter'] = f"http://{nginx_routes['jupyter_server']}/"
+        
+        return AdminUserRow(
+            id=str(user['id']),
+            name=user['username'],
+            email=user['email'],
+            role=role,
+            container=container_name,
+            containerStatus=container_status,
+            resources=resources,
+            server=server_assignment,
+            serverLocation=server_location,
+            status=status,
+            isNewRegistration=is_new_registration,
+            serviceUrls=service_urls
+        )
     
     def get_admin_stats(self) -> Dict[str, Any]:
         try:
-            users = self.db.get_all_users()
-            # Filter out system user
-            real_users = [user for user in (users or []) if user.get('username') != 'System' and user.get('status') != 'system']
-            total_users = len(real_users) if real_users else 4  
-            active_containers = sum(1 for user in real_users if user.get('is_approved', False))
-            if not users:
-                active_containers = 3  
+            # Counts exclude the system user and are computed in SQL
+            summary = self.db.get_user_summary()
+            total_users = summary['total_users'] or 4
+            active_containers = summary['approved_users'] if summary['total_rows'] else 3
             
             stats = {
                 'totalUsers': total_users,
@@ -623,8 +683,8 @@ class UserService:
             
             if self.db.update_user(user_id, update_fields):
                 # Log successful user update
-                if user:
-                    self.db.log_audit_event(
+                if user and self._audit.enabled:
+                    self._audit.submit(
                         admin_username,
                         'update_admin_user',
                         {
@@ -640,97 +700,115 @@ class UserService:
             logger.error(f"Error updating user {user_id}: {e}")
             return False
     
+    def _prepare_admin_user(self, user_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Validate admin-supplied user data and build the users row; no database access."""
+        # Extract user data
+        name = user_data.get('name', '').strip()
+        email = user_data.get('email', '').strip()
+        password = user_data.get('password', 'defaultpass123')  # Default password
+        role = user_data.get('role', 'User')
+        status = user_data.get('status', 'Stopped')
+        server_assignment = user_data.get('server', 'Server 1')
+        resources = user_data.get('resources', DEFAULT_USER_RESOURCES)
+        
+        # Validate required fields
+        if not name or not email:
+            return {'success': False, 'error': 'Name and email are required'}
+        
+        # Determine user_type based on role
+        role_lower = role.lower()
+        if role_lower == 'admin':
+            user_type = 'admin'
+            is_admin = True
+        elif role_lower == 'qvp':
+            user_type = 'qvp'
+            is_admin = False  # QVP is not a full admin
+        else:
+            user_type = 'regular'
+            is_admin = False
+        
+        # Admin and QVP users don't need container assignment
+        needs_container = user_type == 'regular'
+        
+        # Prepare metadata - only include server/resources for regular users
+        metadata = {
+            'created_by_admin': True,
+            'created_at': _now_iso()
+        }
+        if needs_container:
+            metadata['server_assignment'] = server_assignment
+            metadata['resources'] = resources
+        else:
+            metadata['no_container'] = True  # Flag to indicate no container needed
+        
+        # Prepare user data
+        create_data = {
+            'username': name,
+            'password': hash_password(password),
+            'email': email,
+            'is_admin': is_admin,
+            'is_approved': True if user_type in ('admin', 'qvp') else status.lower() == 'running',
+            'user_type': user_type,
+            'metadata': _json_dumps(metadata)
+        }
+        
+        # Set redirect URL only for regular users with container assignment
+        if needs_container and create_data['is_approved'] and server_assignment:
+            create_data['redirect_url'] = f"http://{server_assignment}:{self.agent_port}"
+        
+        return {
+            'success': True,
+            'name': name,
+            'email': email,
+            'password': password,
+            'role': role,
+            'server_assignment': server_assignment,
+            'create_data': create_data
+        }
+    
+    def _audit_admin_user_created(self, prepared: Dict[str, Any], admin_username: str,
+                                  ip_address: Optional[str] = None):
+        """Queue the audit event for an admin-created user."""
+        if not self._audit.enabled:
+            return
+        name, email, role = prepared['name'], prepared['email'], prepared['role']
+        self._audit.submit(
+            admin_username,
+            'create_admin_user',
+            {
+                'message': f'{admin_username} created new user {name} ({email}) with role {role}',
+                'created_user': name,
+                'email': email,
+                'role': role,
+                'server_assignment': prepared['server_assignment']
+            },
+            ip_address
+        )
+    
     def create_admin_user(self, user_data: Dict[str, Any], admin_username: str = "Admin", 
                          ip_address: Optional[str] = None) -> Dict[str, Any]:
         try:
-            # Extract user data
-            name = user_data.get('name', '').strip()
-            email = user_data.get('email', '').strip()
-            password = user_data.get('password', 'defaultpass123')  # Default password
-            role = user_data.get('role', 'User')
-            status = user_data.get('status', 'Stopped')
-            server_assignment = user_data.get('server', 'Server 1')
-            resources = user_data.get('resources', {
-                'cpu': '4 cores',
-                'ram': '8GB',
-                'gpu': '1 core, 12GB'
-            })
-            
-            # Validate required fields
-            if not name or not email:
-                return {'success': False, 'error': 'Name and email are required'}
+            prepared = self._prepare_admin_user(user_data)
+            if not prepared['success']:
+                return prepared
+            name = prepared['name']
             
             # Check if user already exists
             existing_user = self.db.get_user_by_username(name)
             if existing_user:
                 return {'success': False, 'error': 'User with this name already exists'}
             
-            # Hash password
-            password_hash = hash_password(password)
-            
-            # Determine user_type based on role
-            role_lower = role.lower()
-            if role_lower == 'admin':
-                user_type = 'admin'
-                is_admin = True
-            elif role_lower == 'qvp':
-                user_type = 'qvp'
-                is_admin = False  # QVP is not a full admin
-            else:
-                user_type = 'regular'
-                is_admin = False
-            
-            # Admin and QVP users don't need container assignment
-            needs_container = user_type == 'regular'
-            
-            # Prepare metadata - only include server/resources for regular users
-            metadata = {
-                'created_by_admin': True,
-                'created_at': datetime.now().isoformat()
-            }
-            if needs_container:
-                metadata['server_assignment'] = server_assignment
-                metadata['resources'] = resources
-            else:
-                metadata['no_container'] = True  # Flag to indicate no container needed
-            
-            # Prepare user data
-            create_data = {
-                'username': name,
-                'password': password_hash,
-                'email': email,
-                'is_admin': is_admin,
-                'is_approved': True if user_type in ('admin', 'qvp') else status.lower() == 'running',
-                'user_type': user_type,
-                'metadata': json.dumps(metadata)
-            }
-            
-            # Set redirect URL only for regular users with container assignment
-            if needs_container and create_data['is_approved'] and server_assignment:
-                create_data['redirect_url'] = f"http://{server_assignment}:{self.agent_port}"
-            
             # Create user
-            if self.db.create_user(create_data):
-                logger.info(f"Admin created new user: {name} ({email}) with role {role}")
+            if self.db.create_user(prepared['create_data']):
+                logger.info(f"Admin created new user: {name} ({prepared['email']}) with role {prepared['role']}")
                 
                 # Log successful user creation
-                self.db.log_audit_event(
-                    admin_username,
-                    'create_admin_user',
-                    {
-                        'message': f'{admin_username} created new user {name} ({email}) with role {role}',
-                        'created_user': name,
-                        'email': email,
-                        'role': role,
-                        'server_assignment': server_assignment
-                    },
-                    ip_address
-                )
+                self._audit_admin_user_created(prepared, admin_username, ip_address)
                 
                 return {
                     'success': True, 
                     'message': f'User {name} created successfully',
-                    'defaultPassword': password
+                    'defaultPassword': prepared['password']
                 }
             else:
                 return {'success': False, 'error': 'Failed to create user'}
@@ -739,8 +817,67 @@ class UserService:
             logger.error(f"Error creating user: {e}")
             return {'success': False, 'error': 'Failed to create user'}
 
+    def bulk_create_admin_users(self, users: List[Dict[str, Any]], admin_username: str = "Admin",
+                                ip_address: Optional[str] = None) -> Dict[str, Any]:
+        """Create many admin-supplied users with batched existence queries and one multi-row insert."""
+        try:
+            names = [(user_data.get('name') or '').strip() for user_data in users]
+            emails = [(user_data.get('email') or '').strip() for user_data in users]
+            # The users table collation is case-insensitive, so compare casefolded keys
+            existing_names = {n.casefold() for n in self.db.get_existing_usernames([n for n in names if n])}
+            existing_emails = {e.casefold() for e in self.db.get_existing_emails([e for e in emails if e])}
+            
+            # Results keep the input order; slots for rows to insert are filled after the insert
+            results = []
+            to_create = []
+            seen_names = set()
+            seen_emails = set()
+            for name, email, user_data in zip(names, emails, users):
+                name_key, email_key = name.casefold(), email.casefold()
+                if name and (name_key in existing_names or name_key in seen_names):
+                    results.append({'name': name, 'success': False, 'error': 'User with this name already exists'})
+                    continue
+                if email and (email_key in existing_emails or email_key in seen_emails):
+                    results.append({'name': name, 'success': False, 'error': 'User with this email already exists'})
+                    continue
+                prepared = self._prepare_admin_user(user_data)
+                if not prepared['success']:
+                    results.append({'name': name, 'success': False, 'error': prepared['error']})
+                    continue
+                seen_names.add(name_key)
+                seen_emails.add(email_key)
+                to_create.append((len(results), prepared))
+                results.append(None)
+            
+            # Rows that still clash (e.g. a concurrent insert) fail individually
+            created = self.db.create_users_bulk([p['create_data'] for _, p in to_create]) if to_create else []
+            for (index, prepared), ok in zip(to_create, created):
+                if ok:
+                    self._audit_admin_user_created(prepared, admin_username, ip_address)
+                    results[index] = {
+                        'name': prepared['name'],
+                        'success': True,
+                        'defaultPassword': prepared['password']
+                    }
+                else:
+                    results[index] = {'name': prepared['name'], 'success': False, 'error': 'Failed to create user'}
+            
+            created_count = sum(created)
+            if created_count:
+                logger.info(f"Admin {admin_username} bulk created {created_count} users")
+            return {
+                'success': created_count > 0,
+                'created': created_count,
+                'failed': len(results) - created_count,
+                'results': results
+            }
+        except Exception as e:
+            logger.error(f"Error bulk creating users: {e}")
+            return {'success': False, 'error': 'Failed to create users'}
+
     def _delete_user_container(self, container_info: Dict[str, Any], user_id: int, 
-                              server_assignment: Optional[str] = None) -> Dict[str, Any]:
+                              server_assignment: Optional[str] = None,
+                              username: Optional[str] = None) -> Dict[str, Any]:
         result = {
             'success': False,
             'message': '',
@@ -764,11 +901,14 @@ class UserService:
             # Call the agent's delete container endpoint
             try:
                 delete_url = f"http://{server_ip}:{self.agent_port}/api/containers/{container_name}/delete"
+                # Callers that already loaded the user pass the name to save a lookup
+                if username is None:
+                    username = self.db.get_user_by_id(user_id)['username']
                 payload = {'user_id': user_id,
-                    'username': self.db.get_user_by_id(user_id)['username']
+                    'username': username
                 }
                 
-                logger.info(f"Attempting to delete container {container_name} on {server_ip}:{self.agent_port} for user {self.db.get_user_by_id(user_id)['username']}")
+                logger.info(f"Attempting to delete container {container_name} on {server_ip}:{self.agent_port} for user {username}")
                 
                 response = requests.post(
                     delete_url,
@@ -922,16 +1062,17 @@ class UserService:
                 result['message'] = f'Password reset successfully for user {user["username"]}'
                 
                 # Log the password reset action
-                self.db.log_audit_event(
-                    username=admin_username,
-                    action_type='admin_password_reset',
-                    action_details={
-                        'message': f'Admin {admin_username} reset password for user {user["username"]}',
-                        'target_user': user['username'],
-                        'target_user_id': user_id
-                    },
-                    ip_address=None
-                )
+                if self._audit.enabled:
+                    self._audit.submit(
+                        username=admin_username,
+                        action_type='admin_password_reset',
+                        action_details={
+                            'message': f'Admin {admin_username} reset password for user {user["username"]}',
+                            'target_user': user['username'],
+                            'target_user_id': user_id
+                        },
+                        ip_address=None
+                    )
                 
                 logger.info(f"Admin {admin_username} reset password for user {user['username']} (ID: {user_id})")
             else:
@@ -969,15 +1110,16 @@ class UserService:
                 result['message'] = 'Password reset request submitted successfully. An admin will process your request.'
                 
                 # Log the request
-                self.db.log_audit_event(
-                    username=user['username'],
-                    action_type='password_reset_requested',
-                    action_details={
-                        'message': f'User {user["username"]} requested password reset',
-                        'reason': reason
-                    },
-                    ip_address=None
-                )
+                if self._audit.enabled:
+                    self._audit.submit(
+                        username=user['username'],
+                        action_type='password_reset_requested',
+                        action_details={
+                            'message': f'User {user["username"]} requested password reset',
+                            'reason': reason
+                        },
+                        ip_address=None
+                    )
                 
                 logger.info(f"User {user['username']} (ID: {user_id}) requested password reset")
             else:
@@ -3,10 +3,36 @@ import secrets
 import hashlib
 import os
 import re
-from typing import List, Optional
+from typing import List, Optional, Union
 from loguru import logger
 
 
+# Terminal cleanup patterns, applied in order by clean_terminal_output
+_TERMINAL_CLEANUP_PATTERNS = (
+    # ANSI escape sequences: ESC[ followed by any number of digits, semicolons, and letters
+    r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])',
+    # Bracketed paste mode sequences
+    r'\[\?2004[lh]',
+    # Other common control sequences like [K (clear to end of line), [H (cursor home)
+    r'\[[0-9;]*[A-Za-z]',
+    # Carriage returns not followed by newlines
+    r'\r(?!\n)',
+    # Null bytes and other non-printable characters except newlines and tabs
+    r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]',
+)
+# Character each pattern needs in order to match; a cheap `in` test skips the regex
+# when it is absent (the control character class has no single such character)
+_TERMINAL_CLEANUP_GUARDS = ('\x1b', '[', '[', '\r', None)
+_TERMINAL_CLEANUP_RE = tuple(
+    (re.compile(pattern), guard)
+    for pattern, guard in zip(_TERMINAL_CLEANUP_PATTERNS, _TERMINAL_CLEANUP_GUARDS)
+)
+_TERMINAL_CLEANUP_RE_BYTES = tuple(
+    (re.compile(pattern.encode()), guard.encode() if guard else None)
+    for pattern, guard in zip(_TERMINAL_CLEANUP_PATTERNS, _TERMINAL_CLEANUP_GUARDS)
+)
+
+
 def generate_session_token() -> str:
     
     return secrets.token_urlsafe(32)
@@ -84,29 +110,16 @@ def truncate_string(text: str, max_length: int = 100, suffix: str = "...") -> st
     return text[:max_length - len(suffix)] + suffix
 
 
-def clean_terminal_output(text: str) -> str:
+def clean_terminal_output(text: Union[str, bytes]) -> Union[str, bytes]:
     
     if not text:
         return text
     
-    # Remove ANSI escape sequences
-    # This pattern matches ESC[ followed by any number of digits, semicolons, and letters
-    ansi_escape = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
-    text = ansi_escape.sub('', text)
-    
-    # Remove bracketed paste mode sequences
-    bracketed_paste = re.compile(r'\[\?2004[lh]')
-    text = bracketed_paste.sub('', text)
-    
-    # Remove other common control sequences
-    # Remove sequences like [K (clear to end of line), [H (cursor home), etc.
-    control_sequences = re.compile(r'\[[0-9;]*[A-Za-z]')
-    text = control_sequences.sub('', text)
-    
-    # Clean up carriage returns - keep only those followed by newlines
-    text = re.sub(r'\r(?!\n)', '', text)
-    
-    # Remove null bytes and other non-printable characters except newlines and tabs
-    text = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]', '', text)
+    # Patterns are compiled once at import; bytes input is cleaned without decoding
+    patterns = _TERMINAL_CLEANUP_RE_BYTES if isinstance(text, bytes) else _TERMINAL_CLEANUP_RE
+    empty = text[:0]
+    for pattern, guard in patterns:
+        if guard is None or guard in text:
+            text = pattern.sub(empty, text)
     
     return text
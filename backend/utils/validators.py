@@ -1,9 +1,15 @@
 
 import ipaddress
 import re
+from functools import lru_cache
 from typing import Optional
 
 
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+# Username should contain only alphanumeric characters, underscores, and hyphens
+USERNAME_PATTERN = re.compile(r'^[a-zA-Z0-9_-]+$')
+
+
 def is_valid_ip(ip: str) -> bool:
     
     try:
@@ -13,10 +19,10 @@ def is_valid_ip(ip: str) -> bool:
         return False
 
 
+@lru_cache(maxsize=4096)
 def is_valid_email(email: str) -> bool:
     
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email) is not None
+    return EMAIL_PATTERN.match(email) is not None
 
 
 def is_valid_port(port: int) -> bool:
@@ -24,14 +30,13 @@ def is_valid_port(port: int) -> bool:
     return 1 <= port <= 65535
 
 
+@lru_cache(maxsize=4096)
 def is_valid_username(username: str) -> bool:
     
     if not username or len(username) < 3 or len(username) > 50:
         return False
     
-    # Username should contain only alphanumeric characters, underscores, and hyphens
-    pattern = r'^[a-zA-Z0-9_-]+$'
-    return re.match(pattern, username) is not None
+    return USERNAME_PATTERN.match(username) is not None
 
 
 def is_valid_password(password: str) -> bool: